@@ -0,0 +1,13 @@
+"""Performance benchmarks and synthetic transcript generation."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+
+# The project uses a flat `src/` module layout; make it importable without `pip install -e .`.
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
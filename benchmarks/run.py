@@ -0,0 +1,331 @@
+"""Benchmark runner with JSON baselines and regression thresholds.
+
+Usage:
+    python -m benchmarks.run                                  # bundled Apollo 11 JSON
+    python -m benchmarks.run --scale 10 --save-baseline benchmarks/baselines/x10.json
+    python -m benchmarks.run --scale 10 --baseline benchmarks/baselines/x10.json --threshold 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from benchmarks import ROOT_DIR
+from benchmarks.synthetic import DEFAULT_SOURCE, write_synthetic
+from config import MissionStyle, config_defaults, load_merged_config
+from fragment_cache import FragmentCache
+from io_utils import build_page_index, convert_transcript, load_pages, locate_font
+from layout import (
+    build_page_lines,
+    clear_wrap_cache,
+    format_comm,
+    wrap_text,
+)
+from model import BlockType, Page
+from parallel import render_pdf_pipelined
+from renderer import render_pdf, resolve_page_selection
+from variants import render_variants
+
+DEFAULT_THRESHOLD = 0.10
+COMMON_CONFIG = ROOT_DIR / "config" / "common.toml"
+MISSION_CONFIG = ROOT_DIR / "config" / "missions" / "apollo11.toml"
+
+
+class BenchContext:
+    def __init__(self, json_path: str, tmp_dir: str, note_pages: list[int] | None = None) -> None:
+        self.json_path = json_path
+        self.tmp_dir = tmp_dir
+        self.defaults = config_defaults(
+            load_merged_config(str(COMMON_CONFIG), str(MISSION_CONFIG))
+        )
+        if note_pages is not None:
+            self.defaults["note_pages"] = note_pages
+        self.mission_style = MissionStyle.from_settings(self.defaults)
+        self.pages_by_num = load_pages(json_path)
+        self.pages: list[Page] = [self.pages_by_num[num] for num in self.pages_by_num]
+        self.comm_blocks = [
+            block for page in self.pages for block in page.blocks if block.type == BlockType.COMM
+        ]
+        self.font_path = locate_font(self.defaults["font"])
+
+
+def bench_wrap_text(ctx: BenchContext) -> None:
+    for block in ctx.comm_blocks:
+        wrap_text(block.text, 50, space_len=ctx.defaults["space_len"])
+
+
+def bench_wrap_text_cold(ctx: BenchContext) -> None:
+    clear_wrap_cache()
+    bench_wrap_text(ctx)
+
+
+def bench_format_comm(ctx: BenchContext) -> None:
+    for block in ctx.comm_blocks:
+        format_comm(block, ctx.defaults["columns"], wrap_space_len=ctx.defaults["space_len"])
+
+
+def bench_build_page_lines(ctx: BenchContext) -> None:
+    for page in ctx.pages:
+        build_page_lines(
+            page, ctx.defaults["columns"], ctx.defaults["space_len"], ctx.mission_style
+        )
+
+
+def bench_build_page_lines_cold(ctx: BenchContext) -> None:
+    clear_wrap_cache()
+    bench_build_page_lines(ctx)
+
+
+def bench_resolve_page_selection(ctx: BenchContext) -> None:
+    for _ in range(100):
+        resolve_page_selection(
+            pages_by_num=ctx.pages_by_num,
+            pages=[],
+            page_start=1,
+            page_end=None,
+            pdf_pages=[],
+            pdf_start=None,
+            pdf_end=None,
+            pdf_offset=ctx.defaults["pdf_offset"],
+        )
+
+
+def bench_build_page_index(ctx: BenchContext) -> None:
+    build_page_index(ctx.json_path)
+
+
+def bench_load_pages(ctx: BenchContext) -> None:
+    pages_by_num = load_pages(ctx.json_path)
+    for page_num in pages_by_num:
+        pages_by_num[page_num]
+
+
+def bench_load_pages_jsonl_gz(ctx: BenchContext) -> None:
+    jsonl_path = str(Path(ctx.tmp_dir) / "transcript.jsonl.gz")
+    if not os.path.exists(jsonl_path):  # converted during the warm-up run
+        convert_transcript(ctx.json_path, jsonl_path)
+    load_pages(jsonl_path)
+
+
+def render_kwargs(ctx: BenchContext, output_name: str = "bench.pdf") -> dict[str, Any]:
+    defaults = ctx.defaults
+    return dict(
+        pages_by_num=ctx.pages_by_num,
+        output_path=str(Path(ctx.tmp_dir) / output_name),
+        selected_pages=list(ctx.pages_by_num),
+        columns=defaults["columns"],
+        space_len=defaults["space_len"],
+        font_path=ctx.font_path,
+        font_size=defaults["font_size"],
+        left_margin_pt=defaults["left_margin_pt"],
+        line_height_multiplier=defaults["line_height_multiplier"],
+        fit_to_page=defaults["fit_to_page"],
+        page_width_pt=defaults["page_width_pt"],
+        page_height_pt=defaults["page_height_pt"],
+        top_margin_pt=defaults["top_margin_pt"],
+        bottom_margin_pt=defaults["bottom_margin_pt"],
+        dpi=defaults["dpi"],
+        faux_bold_pt=defaults["faux_bold_pt"],
+        mission_style=ctx.mission_style,
+    )
+
+
+def bench_render_pdf(
+    ctx: BenchContext,
+    fragment_cache: FragmentCache | None = None,
+    streaming: bool = False,
+    compact: bool = False,
+    render: Callable[..., object] = render_pdf,
+) -> None:
+    render(
+        **render_kwargs(ctx),
+        fragment_cache=fragment_cache,
+        streaming=streaming,
+        compact=compact,
+    )
+
+
+def bench_render_pdf_fragments(ctx: BenchContext) -> None:
+    # The warm-up run in time_case fills the cache, so timed runs replay fragments.
+    bench_render_pdf(ctx, FragmentCache(str(Path(ctx.tmp_dir) / "fragments")))
+
+
+def bench_render_pdf_streaming(ctx: BenchContext) -> None:
+    bench_render_pdf(ctx, streaming=True)
+
+
+def bench_render_pdf_compact(ctx: BenchContext) -> None:
+    bench_render_pdf(ctx, compact=True)
+
+
+def bench_render_pdf_pipelined(ctx: BenchContext) -> None:
+    # At least two workers, so the pipeline runs even on a single-CPU machine.
+    jobs = max(2, os.cpu_count() or 1)
+    bench_render_pdf(ctx, render=partial(render_pdf_pipelined, jobs=jobs))
+
+
+def bench_render_variants(ctx: BenchContext) -> None:
+    # Print, screen and Letter variants sharing one layout pass, drawn in this process.
+    variants = {
+        "print": render_kwargs(ctx, "bench_print.pdf"),
+        "screen": {
+            **render_kwargs(ctx, "bench_screen.pdf"),
+            "font_size": 12.0,
+            "faux_bold_pt": 0.0,
+        },
+        "letter": {
+            **render_kwargs(ctx, "bench_letter.pdf"),
+            "page_width_pt": 612.0,
+            "page_height_pt": 792.0,
+        },
+    }
+    render_variants(variants, jobs=1)
+
+
+CASES: dict[str, Callable[[BenchContext], None]] = {
+    "wrap_text": bench_wrap_text,
+    "wrap_text_cold": bench_wrap_text_cold,
+    "format_comm": bench_format_comm,
+    "build_page_lines": bench_build_page_lines,
+    "build_page_lines_cold": bench_build_page_lines_cold,
+    "resolve_page_selection": bench_resolve_page_selection,
+    "build_page_index": bench_build_page_index,
+    "load_pages": bench_load_pages,
+    "load_pages_jsonl_gz": bench_load_pages_jsonl_gz,
+    "render_pdf": bench_render_pdf,
+    "render_pdf_fragments": bench_render_pdf_fragments,
+    "render_pdf_streaming": bench_render_pdf_streaming,
+    "render_pdf_compact": bench_render_pdf_compact,
+    "render_pdf_pipelined": bench_render_pdf_pipelined,
+    "render_variants": bench_render_variants,
+}
+
+
+def time_case(func: Callable[[BenchContext], None], ctx: BenchContext, repeat: int) -> list[float]:
+    func(ctx)  # warm-up: imports, font registration, page index sidecar
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(ctx)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmarks(
+    cases: list[str],
+    scale: float,
+    repeat: int,
+    seed: int = 0,
+) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="transcript-bench-") as tmp_dir:
+        if scale == 1:
+            json_path = str(DEFAULT_SOURCE)
+            note_pages = None
+        else:
+            json_path = str(Path(tmp_dir) / "synthetic.json")
+            note_pages = write_synthetic(json_path, scale, seed=seed)
+        ctx = BenchContext(json_path, tmp_dir, note_pages=note_pages)
+
+        results: dict[str, Any] = {}
+        for name in cases:
+            timings = time_case(CASES[name], ctx, repeat)
+            results[name] = {
+                "median_s": statistics.median(timings),
+                "min_s": min(timings),
+                "repeat": repeat,
+            }
+            print(f"{name:<24} median {results[name]['median_s'] * 1000:10.2f} ms")
+
+    return {
+        "meta": {
+            "scale": scale,
+            "pages": len(ctx.pages),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def parse_thresholds(values: list[str], default: float) -> dict[str, float]:
+    thresholds = {name: default for name in CASES}
+    for value in values:
+        if "=" in value:
+            name, _, limit = value.partition("=")
+            thresholds[name.strip()] = float(limit)
+        else:
+            thresholds = {name: float(value) for name in thresholds}
+    return thresholds
+
+
+def compare_to_baseline(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    thresholds: dict[str, float],
+) -> list[str]:
+    regressions = []
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        ratio = result["median_s"] / previous["median_s"] if previous["median_s"] else 1.0
+        limit = thresholds.get(name, DEFAULT_THRESHOLD)
+        status = "REGRESSION" if ratio > 1 + limit else "ok"
+        print(f"{name:<24} {ratio:6.2f}x baseline (limit {1 + limit:.2f}x) {status}")
+        if status != "ok":
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run transcript printer benchmarks.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Corpus size multiplier")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic generator seed")
+    parser.add_argument(
+        "--case",
+        action="append",
+        choices=sorted(CASES),
+        help="Run only this case (repeatable)",
+    )
+    parser.add_argument("--out", default="", help="Write results JSON to this path")
+    parser.add_argument("--baseline", default="", help="Compare against this baseline JSON")
+    parser.add_argument("--save-baseline", default="", help="Store results as a baseline JSON")
+    parser.add_argument(
+        "--threshold",
+        action="append",
+        default=[],
+        help=f"Allowed slowdown ratio, global or per case (0.2, render_pdf=0.3). "
+        f"Default: {DEFAULT_THRESHOLD}",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.case or list(CASES), args.scale, args.repeat, seed=args.seed)
+    for path in (args.out, args.save_baseline):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        thresholds = parse_thresholds(args.threshold, DEFAULT_THRESHOLD)
+        if compare_to_baseline(report, baseline, thresholds):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Synthetic transcript generator scaled from the bundled mission JSON.
+
+Usage:
+    python -m benchmarks.synthetic --scale 10 --out input/synthetic_x10.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from benchmarks import ROOT_DIR
+
+DEFAULT_SOURCE = ROOT_DIR / "input" / "AS11_TEC_merged.json"
+PAGES_PER_TAPE = 8
+NOTE_PAGE_EVERY = 600
+
+
+class _Pools:
+    """Block mix statistics and text pools collected from a source transcript."""
+
+    def __init__(self, pages: list[dict[str, Any]]) -> None:
+        self.block_types: Counter[str] = Counter()
+        self.speakers: Counter[str] = Counter()
+        self.locations: Counter[str] = Counter()
+        self.texts: dict[str, list[str]] = {}
+        self.block_counts: list[int] = []
+        rest_pages = 0
+        for page in pages:
+            if page.get("header", {}).get("page_type") == "rest_period":
+                rest_pages += 1
+                continue
+            blocks = page.get("blocks", [])
+            self.block_counts.append(len(blocks))
+            for block in blocks:
+                block_type = block.get("type", "comm")
+                meta_type = block.get("meta_type")
+                if block_type == "meta" and meta_type in ("end_of_tape", "rest_period"):
+                    continue
+                self.block_types[block_type] += 1
+                text = block.get("text")
+                if text:
+                    self.texts.setdefault(block_type, []).append(text)
+                if block_type == "comm":
+                    self.speakers[block.get("speaker") or "CC"] += 1
+                    self.locations[block.get("location") or ""] += 1
+        self.rest_ratio = rest_pages / max(1, len(pages))
+
+    @staticmethod
+    def pick(rng: random.Random, counter: Counter[str]) -> str:
+        values = list(counter)
+        return rng.choices(values, weights=[counter[value] for value in values])[0]
+
+
+def _format_get(seconds: int) -> str:
+    days, rem = divmod(seconds, 86400)
+    hours, rem = divmod(rem, 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{days:02d} {hours:02d} {minutes:02d} {secs:02d}"
+
+
+def generate_transcript(
+    source_pages: list[dict[str, Any]],
+    page_count: int,
+    seed: int = 0,
+) -> tuple[dict[str, Any], list[int]]:
+    """Build a transcript of `page_count` pages with the source's block mix.
+
+    Returns the transcript dict and the page numbers meant to be NOTE pages.
+    """
+    rng = random.Random(seed)
+    pools = _Pools(source_pages)
+    pages: dict[str, Any] = {}
+    note_pages: list[int] = []
+    get_seconds = 0
+
+    for page_num in range(1, page_count + 1):
+        tape_num, tape_page = divmod(page_num - 1, PAGES_PER_TAPE)
+        header: dict[str, Any] = {
+            "page": page_num,
+            "tape": f"{tape_num + 1}/{tape_page + 1}",
+            "is_apollo_title": tape_page == 0,
+        }
+        blocks: list[dict[str, Any]] = []
+
+        if page_num % NOTE_PAGE_EVERY == 8:
+            note_pages.append(page_num)
+            blocks.append({"type": "continuation", "text": rng.choice(pools.texts["continuation"])})
+        elif rng.random() < pools.rest_ratio:
+            header["page_type"] = "rest_period"
+            blocks.append(
+                {
+                    "type": "meta",
+                    "text": "REST PERIOD - NO COMMUNICATIONS",
+                    "meta_type": "rest_period",
+                }
+            )
+            get_seconds += rng.randint(1800, 7200)
+        else:
+            for _ in range(rng.choice(pools.block_counts)):
+                block_type = pools.pick(rng, pools.block_types)
+                block: dict[str, Any] = {"type": block_type}
+                if block_type == "comm":
+                    get_seconds += rng.randint(2, 90)
+                    block["timestamp"] = _format_get(get_seconds)
+                    block["speaker"] = pools.pick(rng, pools.speakers)
+                    location = pools.pick(rng, pools.locations)
+                    if location:
+                        block["location"] = location
+                block["text"] = rng.choice(pools.texts.get(block_type) or pools.texts["comm"])
+                blocks.append(block)
+            if tape_page == PAGES_PER_TAPE - 1:
+                blocks.append({"type": "meta", "text": "END OF TAPE", "meta_type": "end_of_tape"})
+
+        pages[f"Page {page_num:05d}"] = {"header": header, "blocks": blocks}
+
+    return {"document": f"SYNTHETIC_{page_count}", "pages": pages}, note_pages
+
+
+def load_source_pages(source_path: str | Path = DEFAULT_SOURCE) -> list[dict[str, Any]]:
+    with open(source_path, encoding="utf-8") as file:
+        return list(json.load(file)["pages"].values())
+
+
+def write_synthetic(
+    out_path: str | Path,
+    scale: float,
+    source_path: str | Path = DEFAULT_SOURCE,
+    seed: int = 0,
+) -> list[int]:
+    source_pages = load_source_pages(source_path)
+    transcript, note_pages = generate_transcript(
+        source_pages, max(1, round(len(source_pages) * scale)), seed=seed
+    )
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as file:
+        json.dump(transcript, file, indent=2)
+    return note_pages
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic transcript JSON.")
+    parser.add_argument("--scale", type=float, default=10.0, help="Page count multiplier")
+    parser.add_argument("--source", default=str(DEFAULT_SOURCE), help="Source transcript JSON")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--out", required=True, help="Output JSON path")
+    args = parser.parse_args(argv)
+    note_pages = write_synthetic(args.out, args.scale, source_path=args.source, seed=args.seed)
+    print(f"Wrote {args.out} (note_pages = {note_pages})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
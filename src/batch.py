@@ -0,0 +1,248 @@
+"""Render every mission config in one command, sharing warm worker processes."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from cli import build_parser, prepare_render
+from config import config_defaults, load_merged_config
+from constants import (
+    DEFAULT_COMMON_CONFIG,
+    DEFAULT_FRAGMENT_CACHE_DIR,
+    DEFAULT_LAYOUT_CACHE_DIR,
+    DEFAULT_MISSIONS_DIR,
+)
+from fragment_cache import FragmentCache
+from incremental import build_manifest, is_up_to_date, manifest_path_for, write_manifest
+from io_utils import resolve_input_json_path
+from layout_cache import LayoutCache
+from renderer import render_pdf
+
+STATUS_RENDERED = "rendered"
+STATUS_UP_TO_DATE = "up to date"
+STATUS_FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class MissionTask:
+    """One mission to render, as sent to a batch worker."""
+
+    name: str
+    common_config: str
+    mission_config: str
+    force: bool
+    layout_cache_dir: str | None
+    fragment_cache_dir: str | None
+
+
+@dataclass(frozen=True)
+class MissionResult:
+    """Outcome of one mission render, as reported in the batch summary."""
+
+    name: str
+    status: str
+    output_path: str = ""
+    pages: int = 0
+    seconds: float = 0.0
+    error: str = ""
+
+
+def discover_missions(missions_dir: str) -> list[Path]:
+    """Return mission configs in `missions_dir`, skipping `_`-prefixed templates."""
+    return sorted(
+        path for path in Path(missions_dir).glob("*.toml") if not path.name.startswith("_")
+    )
+
+
+def _input_size(common_config: str, mission_config: str) -> int:
+    defaults = config_defaults(load_merged_config(common_config, mission_config))
+    try:
+        return os.path.getsize(resolve_input_json_path(defaults["json"]))
+    except OSError:
+        return 0
+
+
+def render_mission(task: MissionTask) -> MissionResult:
+    """Render one mission with its merged config defaults, unless its output is current.
+
+    Runs inside pool workers, which keep ReportLab imported and fonts registered
+    across the missions they handle.
+    """
+    start = time.perf_counter()
+    output_path = ""
+    try:
+        defaults = config_defaults(load_merged_config(task.common_config, task.mission_config))
+        args = build_parser(defaults=defaults).parse_args([])
+        layout_cache = LayoutCache(task.layout_cache_dir) if task.layout_cache_dir else None
+        fragment_cache = (
+            FragmentCache(task.fragment_cache_dir) if task.fragment_cache_dir else None
+        )
+        render_kwargs = prepare_render(
+            args, defaults, layout_cache=layout_cache, fragment_cache=fragment_cache
+        )
+        output_path = render_kwargs["output_path"]
+        pages = len(render_kwargs["selected_pages"])
+        if not task.force and is_up_to_date(render_kwargs):
+            status = STATUS_UP_TO_DATE
+        else:
+            render_pdf(**render_kwargs)
+            write_manifest(
+                manifest_path_for(output_path), build_manifest(render_kwargs), output_path
+            )
+            status = STATUS_RENDERED
+    except Exception as exc:  # one broken mission must not stop the batch
+        return MissionResult(
+            name=task.name,
+            status=STATUS_FAILED,
+            output_path=output_path,
+            seconds=time.perf_counter() - start,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return MissionResult(
+        name=task.name,
+        status=status,
+        output_path=output_path,
+        pages=pages,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def run_missions(tasks: list[MissionTask], jobs: int) -> list[MissionResult]:
+    """Render `tasks` on up to `jobs` worker processes, largest inputs first."""
+    workers = max(1, min(jobs, len(tasks)))
+    if workers == 1:
+        return [render_mission(task) for task in tasks]
+
+    ordered = sorted(
+        tasks,
+        key=lambda task: _input_size(task.common_config, task.mission_config),
+        reverse=True,
+    )
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(render_mission, task) for task in ordered]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"{result.name}: {result.status}")
+            results.append(result)
+    return sorted(results, key=lambda result: result.name)
+
+
+def format_summary(results: list[MissionResult], elapsed: float) -> str:
+    name_width = max([len("mission"), *(len(result.name) for result in results)])
+    lines = [f"{'mission':<{name_width}}  {'status':<10}  {'pages':>5}  {'time':>7}  output"]
+    for result in results:
+        detail = result.error if result.status == STATUS_FAILED else result.output_path
+        lines.append(
+            f"{result.name:<{name_width}}  {result.status:<10}  {result.pages:>5}  "
+            f"{result.seconds:>6.2f}s  {detail}"
+        )
+    counts = {
+        status: sum(1 for result in results if result.status == status)
+        for status in (STATUS_RENDERED, STATUS_UP_TO_DATE, STATUS_FAILED)
+    }
+    lines.append(
+        f"{len(results)} missions: {counts[STATUS_RENDERED]} rendered, "
+        f"{counts[STATUS_UP_TO_DATE]} up to date, {counts[STATUS_FAILED]} failed "
+        f"in {elapsed:.2f}s"
+    )
+    return "\n".join(lines)
+
+
+def build_batch_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="nasa-transcript-printer batch",
+        description="Render every mission config with shared worker processes.",
+    )
+    parser.add_argument(
+        "--missions-dir",
+        default=DEFAULT_MISSIONS_DIR,
+        help=f"Directory of mission TOML configs (default: {DEFAULT_MISSIONS_DIR})",
+    )
+    parser.add_argument(
+        "--common-config",
+        default=DEFAULT_COMMON_CONFIG,
+        help=f"Common TOML configuration (default: {DEFAULT_COMMON_CONFIG})",
+    )
+    parser.add_argument(
+        "--mission",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="Only render this mission (config file stem, repeatable)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Missions rendered concurrently (default: CPU count)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Render missions even when their output is up to date",
+    )
+    parser.add_argument(
+        "--layout-cache-dir",
+        default=DEFAULT_LAYOUT_CACHE_DIR,
+        help=f"On-disk layout cache directory (default: {DEFAULT_LAYOUT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-layout-cache",
+        action="store_false",
+        dest="layout_cache",
+        help="Always recompute page layouts",
+    )
+    parser.add_argument(
+        "--fragment-cache-dir",
+        default=DEFAULT_FRAGMENT_CACHE_DIR,
+        help=f"On-disk rendered page cache directory (default: {DEFAULT_FRAGMENT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-fragment-cache",
+        action="store_false",
+        dest="fragment_cache",
+        help="Always draw pages instead of replaying cached page fragments",
+    )
+    return parser
+
+
+def run_batch(argv: list[str] | None = None) -> int:
+    parser = build_batch_parser()
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    mission_paths = discover_missions(args.missions_dir)
+    if args.mission:
+        unknown = set(args.mission) - {path.stem for path in mission_paths}
+        if unknown:
+            parser.error(f"unknown mission(s): {', '.join(sorted(unknown))}")
+        mission_paths = [path for path in mission_paths if path.stem in args.mission]
+    if not mission_paths:
+        parser.error(f"no mission configs found in {args.missions_dir}")
+
+    tasks = [
+        MissionTask(
+            name=path.stem,
+            common_config=args.common_config,
+            mission_config=str(path),
+            force=args.force,
+            layout_cache_dir=args.layout_cache_dir if args.layout_cache else None,
+            fragment_cache_dir=args.fragment_cache_dir if args.fragment_cache else None,
+        )
+        for path in mission_paths
+    ]
+    start = time.perf_counter()
+    results = run_missions(tasks, args.jobs)
+    if args.layout_cache:
+        LayoutCache(args.layout_cache_dir).prune()
+    if args.fragment_cache:
+        FragmentCache(args.fragment_cache_dir).prune()
+    print(format_summary(results, time.perf_counter() - start))
+    return 1 if any(result.status == STATUS_FAILED for result in results) else 0
@@ -3,34 +3,69 @@
 from __future__ import annotations
 
 import argparse
+import cProfile
+import os
+import sys
+import time
+from collections.abc import Container, Mapping
+from functools import partial
+from pathlib import Path
 from typing import Any
 
-from config import config_defaults, load_merged_config
+from config import (
+    MissionStyle,
+    config_defaults,
+    load_merged_config,
+    variant_configs,
+    variant_output_path,
+)
 from constants import (
     BOTTOM_MARGIN_PT,
     COLUMNS,
     DEFAULT_COMMON_CONFIG,
     DEFAULT_DPI,
     DEFAULT_FAUX_BOLD_PT,
+    DEFAULT_FRAGMENT_CACHE_DIR,
+    DEFAULT_FRAGMENT_CACHE_MAX_MB,
     DEFAULT_JSON,
+    DEFAULT_LAYOUT_CACHE_DIR,
+    DEFAULT_LAYOUT_CACHE_MAX_MB,
     DEFAULT_MISSION_CONFIG,
     DEFAULT_OUT,
+    DEFAULT_SHARD_SIZE,
     DEFAULT_START_PAGE,
+    DEFAULT_THUMBNAIL_DPI,
     LINE_HEIGHT_MULTIPLIER,
     PAGE_SIZE,
     PDF_PAGE_OFFSET,
+    RASTER_FORMATS,
     SPACE_LEN,
+    SPLIT_MODES,
     TOP_MARGIN_PT,
 )
+from exporters import TEXT_FORMATS, export_pages, open_text_sinks
+from fragment_cache import FragmentCache
 from io_utils import (
+    convert_transcript,
     load_pages,
     locate_font,
+    page_search_index,
     resolve_input_json_path,
     resolve_output_pdf_path,
 )
 from layout import parse_pages_arg
+from layout_cache import LayoutCache
+from model import Page
+from page_search import filter_selection
+from profiling import Profiler, profile_stage
 from renderer import render_pdf, resolve_page_selection
 
+OUTPUT_FORMATS = ("pdf", *TEXT_FORMATS, *RASTER_FORMATS)
+
+
+class PageSelectionError(ValueError):
+    """The page options select no pages, or name an unknown page, tape or speaker."""
+
 
 def build_parser(defaults: dict[str, Any] | None = None) -> argparse.ArgumentParser:
     defaults = defaults or {}
@@ -51,7 +86,7 @@ def build_parser(defaults: dict[str, Any] | None = None) -> argparse.ArgumentPar
     parser.add_argument(
         "--json",
         default=defaults.get("json", DEFAULT_JSON),
-        help="Path to JSON input",
+        help="Path to JSON input (.json, .jsonl, optionally .gz/.zst compressed)",
     )
     parser.add_argument(
         "--out",
@@ -80,6 +115,16 @@ def build_parser(defaults: dict[str, Any] | None = None) -> argparse.ArgumentPar
         default=int(defaults.get("pdf_offset", PDF_PAGE_OFFSET)),
         help="PDF page N maps to JSON page (N - offset).",
     )
+    parser.add_argument(
+        "--get-range",
+        default="",
+        help="Keep the pages a GET window covers: '00 00 53 11-00 01 10 00', "
+        "'04:06:45:00-' or a single GET",
+    )
+    parser.add_argument(
+        "--tape", default="", help="Keep pages of these tapes or tape pages: 1,3 or 1/7"
+    )
+    parser.add_argument("--speaker", default="", help="Keep pages where these speak: CDR,CC")
     parser.add_argument("--font", default=defaults.get("font", ""), help="Path to TTF font")
     parser.add_argument(
         "--font-size",
@@ -217,68 +262,263 @@ def build_parser(defaults: dict[str, Any] | None = None) -> argparse.ArgumentPar
         dest="rest_period_only_when_no_comm",
         help="Apply rest-period centering even when comm blocks exist",
     )
+    parser.add_argument(
+        "--format",
+        default="pdf",
+        help=f"Comma-separated output formats: {', '.join(OUTPUT_FORMATS)} (default: pdf)",
+    )
+    parser.add_argument(
+        "--raster-dpi",
+        type=int,
+        default=None,
+        help="Resolution of PNG/TIFF pages (default: the configured --dpi)",
+    )
+    parser.add_argument(
+        "--thumbnail",
+        action="store_true",
+        help=f"Write PNG/TIFF pages at {DEFAULT_THUMBNAIL_DPI} DPI",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes: PDF page shards merged with pypdf, PNG/TIFF pages, "
+        "--variants or --split-by files (default: CPU count for all but PDF shards)",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        help=f"Pages per shard when --jobs is set (default: {DEFAULT_SHARD_SIZE})",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Lay out pages in --jobs worker processes (default: CPU count) ahead of a single "
+        "PDF writer, instead of merging shards",
+    )
+    parser.add_argument(
+        "--layout-cache-dir",
+        default=DEFAULT_LAYOUT_CACHE_DIR,
+        help=f"On-disk layout cache directory (default: {DEFAULT_LAYOUT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--layout-cache-max-mb",
+        type=int,
+        default=DEFAULT_LAYOUT_CACHE_MAX_MB,
+        help=f"Layout cache size limit in MB (default: {DEFAULT_LAYOUT_CACHE_MAX_MB})",
+    )
+    parser.add_argument(
+        "--no-layout-cache",
+        action="store_false",
+        dest="layout_cache",
+        help="Always recompute page layouts",
+    )
+    parser.add_argument(
+        "--clear-layout-cache",
+        action="store_true",
+        help="Delete cached page layouts before rendering",
+    )
+    parser.add_argument(
+        "--fragment-cache-dir",
+        default=DEFAULT_FRAGMENT_CACHE_DIR,
+        help=f"On-disk rendered page cache directory (default: {DEFAULT_FRAGMENT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--fragment-cache-max-mb",
+        type=int,
+        default=DEFAULT_FRAGMENT_CACHE_MAX_MB,
+        help=f"Fragment cache size limit in MB (default: {DEFAULT_FRAGMENT_CACHE_MAX_MB})",
+    )
+    parser.add_argument(
+        "--no-fragment-cache",
+        action="store_false",
+        dest="fragment_cache",
+        help="Always draw pages instead of replaying cached page fragments",
+    )
+    parser.add_argument(
+        "--clear-fragment-cache",
+        action="store_true",
+        help="Delete cached page fragments before rendering",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write each page to the output PDF as soon as it is drawn (flat memory)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Smallest streamed PDF: shared headers, object streams, minimal font subset",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Re-render only pages changed since the last --incremental build (requires pypdf)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-render pages affected by edits to the JSON or configs",
+    )
+    parser.add_argument(
+        "--watch-preview",
+        action="store_true",
+        help="With --watch, write only the pages changed by each save to <out>.preview.pdf",
+    )
+    parser.add_argument(
+        "--variants",
+        default="",
+        metavar="NAMES",
+        help="Render these [variants.<name>] config tables (comma-separated, or 'all') to "
+        "<out>_<name>.pdf from one load and shared layouts",
+    )
+    parser.add_argument(
+        "--split-by",
+        choices=SPLIT_MODES,
+        default=None,
+        help="Write one PDF per tape to <out>_tapes/, rendered on --jobs processes",
+    )
+    parser.add_argument(
+        "--split-combined",
+        action="store_true",
+        help="With --split-by, also render the whole selection to <out>, with a "
+        "tape/page/GET outline (requires pypdf)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="REPORT",
+        help="Lay out pages without rendering and report line budgets, truncation and "
+        "over-width lines (a table on stdout, or a JSON REPORT, '-' for stdout); "
+        "exits 1 if any page loses or clips lines",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="REPORT",
+        help="Write a JSON timing report (default: <out>.profile.json, '-' for stdout)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also trace Python heap peaks per stage with tracemalloc (slower)",
+    )
+    parser.add_argument(
+        "--profile-pstats",
+        default="",
+        metavar="PATH",
+        help="Dump cProfile statistics for the whole run to PATH",
+    )
     return parser
 
 
-def run(argv: list[str] | None = None) -> int:
-    pre_parser = argparse.ArgumentParser(add_help=False)
-    pre_parser.add_argument("--common-config", default=DEFAULT_COMMON_CONFIG)
-    pre_parser.add_argument("--mission-config", default=DEFAULT_MISSION_CONFIG)
-    pre_args, _ = pre_parser.parse_known_args(argv)
-    merged_config = load_merged_config(pre_args.common_config, pre_args.mission_config)
-    defaults = config_defaults(merged_config)
+# Mission style settings that command-line flags override.
+_CLI_STYLE_KEYS = (
+    "title_line",
+    "goss_line",
+    "annotation_top_blank_lines",
+    "end_of_tape_indent_col",
+    "center_rest_period_text",
+    "rest_period_keep_header",
+    "rest_period_only_when_no_comm",
+)
 
-    parser = build_parser(defaults=defaults)
-    args = parser.parse_args(argv)
 
-    pages_by_num = load_pages(resolve_input_json_path(args.json))
-    selected_pages = resolve_page_selection(
-        pages_by_num=pages_by_num,
-        pages=parse_pages_arg(args.pages),
-        page_start=args.start_page,
-        page_end=args.end_page,
-        pdf_pages=parse_pages_arg(args.pdf_pages),
-        pdf_start=args.pdf_start_page,
-        pdf_end=args.pdf_end_page,
-        pdf_offset=args.pdf_offset,
-    )
-
-    mission_style: dict[str, Any] = {
-        "title_line": defaults.get("title_line"),
-        "goss_line": defaults.get("goss_line"),
-        "annotation_top_blank_lines": defaults.get("annotation_top_blank_lines"),
-        "end_of_tape_indent_col": defaults.get("end_of_tape_indent_col"),
-        "center_rest_period_text": defaults.get("center_rest_period_text"),
-        "rest_period_keep_header": defaults.get("rest_period_keep_header"),
-        "rest_period_only_when_no_comm": defaults.get("rest_period_only_when_no_comm"),
-        "note_pages": defaults.get("note_pages", []),
-        "note_heading": defaults.get("note_heading"),
-        "note_top_blank_lines": defaults.get("note_top_blank_lines"),
-        "note_center_vertical": defaults.get("note_center_vertical"),
-        "note_block_columns": defaults.get("note_block_columns"),
-        "rest_period_isolated_pages": defaults.get("rest_period_isolated_pages", []),
-        "rest_period_mixed_pages": defaults.get("rest_period_mixed_pages", []),
-        "footer_pages": defaults.get("footer_pages", []),
-    }
-    mission_style.update(
-        {
-            "title_line": args.title_line,
-            "goss_line": args.goss_line,
-            "annotation_top_blank_lines": args.annotation_top_blank_lines,
-            "end_of_tape_indent_col": args.end_of_tape_indent_col,
-            "center_rest_period_text": args.center_rest_period_text,
-            "rest_period_keep_header": args.rest_period_keep_header,
-            "rest_period_only_when_no_comm": args.rest_period_only_when_no_comm,
-        }
-    )
-
-    render_pdf(
+def build_mission_style(defaults: dict[str, Any], args: argparse.Namespace) -> MissionStyle:
+    overrides = {key: getattr(args, key) for key in _CLI_STYLE_KEYS}
+    return MissionStyle.from_settings({**defaults, **overrides})
+
+
+def size_report(sizes: dict[str, int]) -> str:
+    """One line comparing a streamed PDF's size with its uncompressed size."""
+    total = sizes["total"]
+    parts = ", ".join(
+        f"{part} {sizes[part]:,}" for part in ("content", "fonts", "forms", "structure")
+    )
+    saved = 1 - total / sizes["uncompressed"] if sizes["uncompressed"] else 0.0
+    return (
+        f"PDF size: {total:,} bytes ({parts}); {sizes['uncompressed']:,} bytes"
+        f" uncompressed, {saved:.0%} smaller"
+    )
+
+
+def requested_pages(args: argparse.Namespace) -> Container[int] | None:
+    """Pages an explicit selection can include, or None when it depends on the whole transcript.
+
+    Streamed (compressed or JSON Lines) inputs skip other pages while decoding.
+    GET, tape and speaker filters consult every page, so they disable this.
+    """
+    if args.get_range or args.tape or args.speaker:
+        return None
+    if args.pdf_pages:
+        return {page - args.pdf_offset for page in parse_pages_arg(args.pdf_pages)}
+    if args.pdf_start_page is not None:
+        end = args.pdf_end_page if args.pdf_end_page is not None else args.pdf_start_page
+        low, high = sorted((args.pdf_start_page, end))
+        return range(low - args.pdf_offset, high - args.pdf_offset + 1)
+    if args.pages:
+        return set(parse_pages_arg(args.pages))
+    if args.end_page is not None:
+        low, high = sorted((args.start_page, args.end_page))
+        return range(low, high + 1)
+    return None
+
+
+def prepare_render(
+    args: argparse.Namespace,
+    defaults: dict[str, Any],
+    layout_cache: LayoutCache | None = None,
+    fragment_cache: FragmentCache | None = None,
+    profiler: Profiler | None = None,
+    pages_by_num: Mapping[int, Page] | None = None,
+) -> dict[str, Any]:
+    """Load pages, resolve the selection and font, and return `render_pdf` arguments.
+
+    `pages_by_num` reuses pages already loaded from `args.json`. Invalid or
+    empty page selections raise `PageSelectionError`.
+    """
+    if pages_by_num is None:
+        with profile_stage(profiler, "load_pages"):
+            pages_by_num = load_pages(resolve_input_json_path(args.json), requested_pages(args))
+    with profile_stage(profiler, "page_selection"):
+        try:
+            selected_pages = resolve_page_selection(
+                pages_by_num=pages_by_num,
+                pages=parse_pages_arg(args.pages),
+                page_start=args.start_page,
+                page_end=args.end_page,
+                pdf_pages=parse_pages_arg(args.pdf_pages),
+                pdf_start=args.pdf_start_page,
+                pdf_end=args.pdf_end_page,
+                pdf_offset=args.pdf_offset,
+            )
+            if args.get_range or args.tape or args.speaker:
+                selected_pages = filter_selection(
+                    selected_pages,
+                    page_search_index(pages_by_num),
+                    get_range=args.get_range,
+                    tapes=args.tape,
+                    speakers=args.speaker,
+                )
+        except ValueError as exc:
+            raise PageSelectionError(str(exc)) from exc
+    mission_style = build_mission_style(defaults, args)
+
+    with profile_stage(profiler, "font_lookup"):
+        font_path = locate_font(args.font)
+    output_path = resolve_output_pdf_path(args.out)
+    return dict(
         pages_by_num=pages_by_num,
-        output_path=resolve_output_pdf_path(args.out),
+        output_path=output_path,
         selected_pages=selected_pages,
         columns=args.columns,
         space_len=args.space_len,
-        font_path=locate_font(args.font),
+        font_path=font_path,
         font_size=args.font_size,
         left_margin_pt=args.left_margin_pt,
         line_height_multiplier=args.line_height_multiplier,
@@ -290,7 +530,326 @@ def run(argv: list[str] | None = None) -> int:
         dpi=args.dpi,
         faux_bold_pt=args.faux_bold_pt,
         mission_style=mission_style,
+        layout_cache=layout_cache,
+        fragment_cache=fragment_cache,
+        profiler=profiler,
     )
+
+
+def run_variants(
+    argv: list[str],
+    args: argparse.Namespace,
+    defaults: dict[str, Any],
+    variants: dict[str, dict[str, Any]],
+    merged_config: dict[str, Any],
+    layout_cache: LayoutCache | None = None,
+    fragment_cache: FragmentCache | None = None,
+    profiler: Profiler | None = None,
+) -> str:
+    """Render each variant config from one page load; command-line options apply to all.
+
+    Returns the base output path, which names the profile report.
+    """
+    from variants import format_summary, render_variants
+
+    start = time.perf_counter()
+    base_kwargs = prepare_render(args, defaults, profiler=profiler)
+    variant_kwargs = {}
+    for name, config_data in variants.items():
+        variant_defaults = config_defaults(config_data)
+        variant_args = build_parser(defaults=variant_defaults).parse_args(argv)
+        own_out = merged_config["variants"][name].get("paths", {}).get("out")
+        variant_args.out = own_out or variant_output_path(args.out, name)
+        variant_kwargs[name] = prepare_render(
+            variant_args,
+            variant_defaults,
+            fragment_cache=fragment_cache,
+            pages_by_num=base_kwargs["pages_by_num"],
+        )
+    results = render_variants(
+        variant_kwargs,
+        jobs=args.jobs or os.cpu_count() or 1,
+        layout_cache=layout_cache,
+        profiler=profiler,
+        streaming=args.stream,
+        compact=args.compact,
+    )
+    print(format_summary(results, time.perf_counter() - start))
+    output_path: str = base_kwargs["output_path"]
+    return output_path
+
+
+def finish_run(
+    output_path: str,
+    pre_args: argparse.Namespace,
+    layout_cache: LayoutCache | None,
+    fragment_cache: FragmentCache | None,
+    stats: cProfile.Profile | None,
+    profiler: Profiler | None,
+) -> None:
+    """Prune the on-disk caches and write the requested profiles."""
+    if layout_cache is not None:
+        layout_cache.prune()
+    if fragment_cache is not None:
+        fragment_cache.prune()
+
+    if stats is not None:
+        stats.disable()
+        stats.dump_stats(pre_args.profile_pstats)
+    if profiler is not None:
+        profiler.write(pre_args.profile or str(Path(output_path).with_suffix(".profile.json")))
+
+
+def run_convert(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="nasa-transcript-printer convert",
+        description="Rewrite a transcript as JSON Lines, optionally gzip or zstd compressed.",
+    )
+    parser.add_argument("source", help="Transcript input (.json, .jsonl, optionally .gz/.zst)")
+    parser.add_argument("out", help="Output path: .jsonl, .jsonl.gz or .jsonl.zst")
+    args = parser.parse_args(argv)
+    source = resolve_input_json_path(args.source)
+    try:
+        pages = convert_transcript(source, args.out)
+    except ValueError as exc:
+        parser.error(str(exc))
+    source_size = os.path.getsize(source)
+    out_size = os.path.getsize(args.out)
+    print(f"{pages} pages: {source} ({source_size:,} bytes) -> {args.out} ({out_size:,} bytes)")
+    return 0
+
+
+def run(argv: list[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "convert":
+        return run_convert(argv[1:])
+    if argv and argv[0] == "batch":
+        # Imported here: subcommands build on this module's parser and helpers.
+        from batch import run_batch
+
+        return run_batch(argv[1:])
+    if argv and argv[0] == "serve":
+        from server import run_server
+
+        return run_server(argv[1:])
+
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument("--common-config", default=DEFAULT_COMMON_CONFIG)
+    pre_parser.add_argument("--mission-config", default=DEFAULT_MISSION_CONFIG)
+    pre_parser.add_argument("--profile", nargs="?", const="", default=None)
+    pre_parser.add_argument("--profile-memory", action="store_true")
+    pre_parser.add_argument("--profile-pstats", default="")
+    pre_args, _ = pre_parser.parse_known_args(argv)
+
+    profiler = None
+    if pre_args.profile is not None:
+        profiler = Profiler(trace_memory=pre_args.profile_memory)
+    stats = cProfile.Profile() if pre_args.profile_pstats else None
+    if stats is not None:
+        stats.enable()
+
+    with profile_stage(profiler, "config"):
+        merged_config = load_merged_config(pre_args.common_config, pre_args.mission_config)
+        defaults = config_defaults(merged_config)
+
+        parser = build_parser(defaults=defaults)
+        args = parser.parse_args(argv)
+        if args.jobs is not None and args.jobs < 1:
+            parser.error("--jobs must be at least 1")
+        if args.pipeline and args.jobs is None:
+            args.jobs = os.cpu_count() or 1
+        sharded = args.jobs is not None and not (args.pipeline or args.variants or args.split_by)
+        for flag in ("stream", "compact"):
+            if getattr(args, flag) and (sharded or args.incremental or args.watch):
+                parser.error(
+                    f"--{flag} cannot be combined with sharded --jobs, --incremental or --watch"
+                )
+        formats = [fmt.strip().lower() for fmt in args.format.split(",") if fmt.strip()]
+        unknown = sorted(set(formats) - set(OUTPUT_FORMATS))
+        if unknown or not formats:
+            parser.error(f"--format must list {', '.join(OUTPUT_FORMATS)}, got {args.format!r}")
+        if args.watch and formats != ["pdf"]:
+            parser.error("--watch only renders --format pdf")
+        if args.dry_run is not None and args.watch:
+            parser.error("--dry-run cannot be combined with --watch")
+        variants = {}
+        if args.variants:
+            if args.watch or args.incremental or args.pipeline or args.dry_run is not None:
+                parser.error(
+                    "--variants cannot be combined with --watch, --incremental, --pipeline "
+                    "or --dry-run"
+                )
+            if formats != ["pdf"]:
+                parser.error("--variants only renders --format pdf")
+            try:
+                variants = variant_configs(merged_config)
+            except ValueError as exc:
+                parser.error(str(exc))
+            names = [name.strip() for name in args.variants.split(",") if name.strip()]
+            if names != ["all"]:
+                unknown = sorted(set(names) - set(variants))
+                if unknown:
+                    parser.error(f"unknown variant(s): {', '.join(unknown)}")
+                variants = {name: variants[name] for name in names}
+            if not variants:
+                parser.error("no [variants.<name>] tables in the config")
+        if args.split_combined and not args.split_by:
+            parser.error("--split-combined requires --split-by")
+        if args.split_by:
+            if args.watch or args.pipeline or args.variants or args.dry_run is not None:
+                parser.error(
+                    "--split-by cannot be combined with --watch, --pipeline, --variants "
+                    "or --dry-run"
+                )
+            if formats != ["pdf"]:
+                parser.error("--split-by only renders --format pdf")
+
+    if args.clear_layout_cache:
+        LayoutCache(args.layout_cache_dir).clear()
+    layout_cache = None
+    if args.layout_cache:
+        layout_cache = LayoutCache(args.layout_cache_dir, args.layout_cache_max_mb << 20)
+    if args.clear_fragment_cache:
+        FragmentCache(args.fragment_cache_dir).clear()
+    fragment_cache = None
+    if args.fragment_cache:
+        fragment_cache = FragmentCache(args.fragment_cache_dir, args.fragment_cache_max_mb << 20)
+
+    def prepare(**kwargs: Any) -> dict[str, Any]:
+        try:
+            return prepare_render(args, defaults, profiler=profiler, **kwargs)
+        except PageSelectionError as exc:
+            parser.error(str(exc))
+
+    if args.dry_run is not None:
+        from dry_run import layout_report, write_report
+
+        render_kwargs = prepare(layout_cache=layout_cache)
+        fits = layout_report(**render_kwargs)
+        write_report(fits, args.dry_run)
+        output_path = render_kwargs["output_path"]
+        finish_run(output_path, pre_args, layout_cache, fragment_cache, stats, profiler)
+        return 1 if any(fit.truncated or fit.overflow for fit in fits) else 0
+
+    if variants:
+        try:
+            output_path = run_variants(
+                argv,
+                args,
+                defaults,
+                variants,
+                merged_config,
+                layout_cache=layout_cache,
+                fragment_cache=fragment_cache,
+                profiler=profiler,
+            )
+        except PageSelectionError as exc:
+            parser.error(str(exc))
+        finish_run(output_path, pre_args, layout_cache, fragment_cache, stats, profiler)
+        return 0
+
+    if args.split_by:
+        from split import format_summary, render_split, tape_output_dir
+
+        start = time.perf_counter()
+        render_kwargs = prepare(layout_cache=layout_cache, fragment_cache=fragment_cache)
+        output_path = render_kwargs["output_path"]
+        with profile_stage(profiler, "render"):
+            results = render_split(
+                **render_kwargs,
+                jobs=args.jobs or os.cpu_count() or 1,
+                incremental=args.incremental,
+                combined=args.split_combined,
+                streaming=args.stream,
+                compact=args.compact,
+            )
+        summary = format_summary(results, time.perf_counter() - start)
+        print(f"{summary}: {tape_output_dir(output_path)}")
+        finish_run(output_path, pre_args, layout_cache, fragment_cache, stats, profiler)
+        return 0
+
+    render = render_pdf
+    if args.pipeline:
+        from parallel import render_pdf_pipelined
+
+        render = partial(render_pdf_pipelined, jobs=args.jobs)
+    elif sharded:
+        from parallel import render_pdf_parallel
+
+        render = partial(render_pdf_parallel, jobs=args.jobs, shard_size=args.shard_size)
+    if args.watch:
+        from watch import run_watch
+
+        try:
+            return run_watch(
+                argv,
+                pre_args.common_config,
+                pre_args.mission_config,
+                preview=args.watch_preview,
+                render=render,
+                layout_cache=layout_cache,
+                fragment_cache=fragment_cache,
+                profiler=profiler,
+            )
+        finally:
+            output_path = resolve_output_pdf_path(args.out)
+            finish_run(output_path, pre_args, layout_cache, fragment_cache, stats, profiler)
+
+    render_kwargs = prepare(layout_cache=layout_cache, fragment_cache=fragment_cache)
+    output_path = render_kwargs["output_path"]
+    text_sinks = open_text_sinks(
+        [fmt for fmt in TEXT_FORMATS if fmt in formats], output_path, render_kwargs["columns"]
+    )
+    # Text exports ride along the PDF layout pass unless it is split into shards or
+    # skipped as up to date; then they get a layout-only pass of their own.
+    shared_pass = "pdf" in formats and not sharded and not args.incremental
+    try:
+        if "pdf" in formats:
+            with profile_stage(profiler, "render"):
+                if args.incremental:
+                    from incremental import render_pdf_incremental
+
+                    render_pdf_incremental(render=render, **render_kwargs)
+                elif shared_pass:
+                    sizes = render(
+                        **render_kwargs,
+                        page_sinks=text_sinks,
+                        streaming=args.stream,
+                        compact=args.compact,
+                    )
+                    if args.compact and sizes is not None:
+                        print(size_report(sizes), file=sys.stderr)
+                else:
+                    render(**render_kwargs)
+            if not args.incremental:
+                from incremental import build_manifest, manifest_path_for, write_manifest
+
+                # Keep the build manifest in step with the PDF just written, so later
+                # --incremental and batch runs for this output see what it now holds.
+                with profile_stage(profiler, "build_manifest"):
+                    manifest = build_manifest(render_kwargs)
+                    write_manifest(manifest_path_for(output_path), manifest, output_path)
+        if text_sinks and not shared_pass:
+            export_pages(**render_kwargs, sinks=text_sinks)
+    finally:
+        for sink in text_sinks:
+            sink.close()
+
+    raster_formats = [fmt for fmt in RASTER_FORMATS if fmt in formats]
+    if raster_formats:
+        raster_dpi = args.raster_dpi or args.dpi
+        if args.thumbnail:
+            raster_dpi = DEFAULT_THUMBNAIL_DPI
+        from raster import render_raster
+
+        render_raster(
+            **render_kwargs,
+            formats=raster_formats,
+            raster_dpi=raster_dpi,
+            jobs=args.jobs or os.cpu_count() or 1,
+        )
+    finish_run(output_path, pre_args, layout_cache, fragment_cache, stats, profiler)
     return 0
 
 
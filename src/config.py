@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -58,6 +61,30 @@ def load_merged_config(common_path: str, mission_path: str) -> dict[str, Any]:
     return deep_merge(common, mission)
 
 
+# Sections a `[variants.<name>]` table may override. Variants share one input and page
+# selection, so `[pagination]` and `paths.json` stay with the base config.
+VARIANT_SECTIONS = ("font", "layout", "page", "mission", "special_pages", "paths")
+
+
+def variant_configs(config_data: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Merged config of each `[variants.<name>]` table, overlaid on the rest of the config."""
+    base = {key: value for key, value in config_data.items() if key != "variants"}
+    merged = {}
+    for name, overlay in config_data.get("variants", {}).items():
+        if set(overlay) - set(VARIANT_SECTIONS) or "json" in overlay.get("paths", {}):
+            raise ValueError(
+                f"[variants.{name}] may only set {', '.join(VARIANT_SECTIONS)} (and not paths.json)"
+            )
+        merged[name] = deep_merge(base, overlay)
+    return merged
+
+
+def variant_output_path(output_path: str, name: str) -> str:
+    """`output/run.pdf` -> `output/run_<name>.pdf`."""
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}_{name}{path.suffix}"))
+
+
 def config_defaults(config_data: dict[str, Any]) -> dict[str, Any]:
     paths = config_data.get("paths", {})
     pagination = config_data.get("pagination", {})
@@ -110,3 +137,95 @@ def config_defaults(config_data: dict[str, Any]) -> dict[str, Any]:
         "rest_period_mixed_pages": list(_safe_get(special_pages, "rest_period_mixed_pages", [])),
         "footer_pages": list(_safe_get(special_pages, "footer_pages", [])),
     }
+
+
+def _page_set(value: Iterable[Any] | None) -> frozenset[int]:
+    return frozenset(int(page) for page in value or ())
+
+
+@dataclass(frozen=True)
+class HeaderTemplate:
+    """Page header lines of one mission style at one column count.
+
+    Everything but the tape and page number fields is formatted once.
+    """
+
+    title_lines: tuple[str, ...]
+    goss_line: str
+    tape_width: int
+    columns: int
+
+    def goss_tape_line(self, tape: str) -> str:
+        """GOSS net line with `Tape <tape>` right-aligned, if it fits after a space."""
+        tape_field = f"Tape {tape}"
+        if len(tape_field) < self.tape_width:
+            return self.goss_line + tape_field.rjust(self.tape_width)
+        return self.goss_line
+
+    def page_line(self, page: int | None) -> str:
+        return f"Page {page}".rjust(self.columns)
+
+
+@lru_cache(maxsize=32)
+def _header_template(title_line: str, goss_line: str, columns: int) -> HeaderTemplate:
+    pad = max(0, (columns - len(title_line)) // 2)
+    return HeaderTemplate(
+        title_lines=(" " * pad + title_line, "", ""),
+        goss_line=goss_line,
+        tape_width=columns - len(goss_line),
+        columns=columns,
+    )
+
+
+@dataclass(frozen=True)
+class MissionStyle:
+    """Mission layout settings, compiled once per run from the merged config and CLI.
+
+    Page lists become frozensets, so per-page checks are set lookups. Instances
+    are hashable and can key memoized layout helpers.
+    """
+
+    title_line: str = "AIR-TO-GROUND VOICE TRANSCRIPTION"
+    goss_line: str = "(GOSS NET 1)"
+    annotation_top_blank_lines: int = 1
+    end_of_tape_indent_col: int = TIMESTAMP_COL
+    center_rest_period_text: bool = True
+    rest_period_keep_header: bool = True
+    rest_period_only_when_no_comm: bool = True
+    note_pages: frozenset[int] = frozenset()
+    note_heading: str = "NOTE"
+    note_top_blank_lines: int = 2
+    note_center_vertical: bool = False
+    note_block_columns: int = COLUMNS
+    rest_period_isolated_pages: frozenset[int] = frozenset()
+    rest_period_mixed_pages: frozenset[int] = frozenset()
+    footer_pages: frozenset[int] = frozenset()
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any]) -> MissionStyle:
+        """Build from `config_defaults()`-style keys; missing or None values keep the default."""
+        values: dict[str, Any] = {}
+        for field in fields(cls):
+            value = settings.get(field.name)
+            if value is None:
+                continue
+            if field.name.endswith("_pages"):
+                values[field.name] = _page_set(value)
+            elif field.type == "bool":
+                values[field.name] = bool(value)
+            elif field.type == "int":
+                values[field.name] = int(value)
+            else:
+                values[field.name] = str(value)
+        return cls(**values)
+
+    def header_template(self, columns: int) -> HeaderTemplate:
+        """Header lines for `columns`, built once per title, GOSS line and column count."""
+        return _header_template(self.title_line, self.goss_line, columns)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready settings (page sets as sorted lists), for hashing and reports."""
+        return {
+            key: sorted(value) if isinstance(value, frozenset) else value
+            for key, value in asdict(self).items()
+        }
@@ -6,6 +6,7 @@ DEFAULT_JSON = "input/AS11_TEC_merged.json"
 DEFAULT_OUT = "output/AS11_TEC_full.pdf"
 DEFAULT_COMMON_CONFIG = "config/common.toml"
 DEFAULT_MISSION_CONFIG = "config/missions/apollo11.toml"
+DEFAULT_MISSIONS_DIR = "config/missions"
 DEFAULT_START_PAGE = 3
 DEFAULT_FONT_HINT = "Prestige Elite"
 DEFAULT_DPI = 1200
@@ -23,5 +24,47 @@ TOP_MARGIN_PT = 30
 BOTTOM_MARGIN_PT = 30
 PDF_PAGE_OFFSET = 2  # PDF page 3 corresponds to JSON page 1
 SPACE_LEN = 1
+WRAP_CACHE_SIZE = 65536  # memoized (text, width, space_len) wraps kept in memory
+
+# Parallel rendering: shard boundaries are fixed so output does not depend on --jobs.
+DEFAULT_SHARD_SIZE = 32
+# Pipelined rendering: pages per layout task sent to a worker.
+PIPELINE_CHUNK_PAGES = 8
+
+# Compressed and JSON Lines transcripts: characters read per streaming decode step and the
+# compression levels used by `convert`.
+TRANSCRIPT_READ_CHUNK = 1 << 20
+GZIP_LEVEL = 9
+ZSTD_LEVEL = 19
+
+# On-disk layout cache (finished line lists keyed by page content + layout settings).
+DEFAULT_LAYOUT_CACHE_DIR = ".cache/layout"
+DEFAULT_LAYOUT_CACHE_MAX_MB = 64
+
+# On-disk fragment cache (finished page drawing operators keyed by page content + settings).
+DEFAULT_FRAGMENT_CACHE_DIR = ".cache/fragments"
+DEFAULT_FRAGMENT_CACHE_MAX_MB = 256
+
+# On-disk font cache (TrueType character tables keyed by font path, size and mtime), in
+# the per-user cache directory under this name.
+FONT_CACHE_APP_DIR = "nasa-transcript-printer"
+
+# Render server: rendered excerpts kept in memory (LRU, bounded by count and size).
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8765
+DEFAULT_SERVER_CACHE_ENTRIES = 256
+DEFAULT_SERVER_CACHE_MAX_MB = 64
+
+# Watch mode: file polling interval and how long a change must settle before a rebuild.
+WATCH_POLL_S = 0.05
+WATCH_DEBOUNCE_S = 0.2
+
+# Split output: page groups written to one PDF each by --split-by.
+SPLIT_MODES = ("tape",)
+
+# Raster export: print resolutions are written 1-bit; thumbnails use a screen resolution.
+RASTER_FORMATS = ("png", "tiff")
+BILEVEL_MIN_DPI = 600
+DEFAULT_THUMBNAIL_DPI = 36
 
 PAGE_SIZE = (605, 756)
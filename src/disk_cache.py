@@ -0,0 +1,83 @@
+"""Content-addressed JSON file cache shared by the layout and fragment caches."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+
+class JsonFileCache:
+    """Stores one small JSON document per key under `<cache_dir>/<key[:2]>/<key>.json`.
+
+    Reads refresh the entry mtime, and `prune()` evicts the least recently used
+    entries once the cache exceeds `max_bytes`. Write failures are ignored: a
+    cache that cannot be written behaves like an empty one.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def load(self, key: str) -> Any | None:
+        entry_path = self._entry_path(key)
+        try:
+            with entry_path.open(encoding="utf-8") as file:
+                data = json.load(file)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def contains(self, key: str) -> bool:
+        """Whether `key` has an entry; unlike `load`, not counted as a hit or miss."""
+        return self._entry_path(key).is_file()
+
+    def store(self, key: str, payload: Any) -> None:
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as file:
+                json.dump(payload, file, separators=(",", ":"))
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            pass
+
+    def prune(self) -> int:
+        if not self.cache_dir.is_dir():
+            return 0
+        entries = []
+        total = 0
+        for entry_path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                entry_path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
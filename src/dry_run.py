@@ -0,0 +1,157 @@
+"""`--dry-run`: layout-only line budget report, without ReportLab."""
+
+from __future__ import annotations
+
+import json
+import sys
+from collections.abc import Mapping, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from config import MissionStyle
+from layout import PAGE_KIND_NORMAL, PageLayout, layout_page
+from layout_cache import LayoutCache
+from model import Page
+from profiling import Profiler, profile_stage
+from renderer import PageGeometry, build_geometry, fit_lines, line_budget, place_lines
+
+# Tolerance for baselines that land exactly on a margin.
+_EPSILON = 1e-6
+
+
+@dataclass(frozen=True)
+class PageFit:
+    """How one laid-out page fits its line budget.
+
+    `truncated` lines are dropped by `render_pdf` (normal pages without
+    `fit_to_page`); `overflow` lines are drawn past the top or bottom margin
+    (centered NOTE and rest period pages); `over_width` lines are longer than
+    `columns` characters.
+    """
+
+    page: int
+    kind: str
+    lines: int
+    budget: int
+    line_height: float
+    squeezed: bool
+    truncated: int
+    overflow: int
+    over_width: int
+
+
+def fit_page(
+    page_num: int, page_layout: PageLayout, geometry: PageGeometry, columns: int
+) -> PageFit:
+    lines = [*page_layout.header_lines, *page_layout.lines]
+    line_height = geometry.line_height
+    truncated = overflow = 0
+    if page_layout.kind == PAGE_KIND_NORMAL:
+        line_height, drawn = fit_lines(len(page_layout.lines), geometry)
+        truncated = len(page_layout.lines) - drawn
+    else:
+        top = geometry.page_height - geometry.top_margin + _EPSILON
+        bottom = geometry.bottom_margin - _EPSILON
+        overflow = sum(not bottom <= y <= top for _, y, _ in place_lines(page_layout, geometry))
+    return PageFit(
+        page=page_num,
+        kind=page_layout.kind,
+        lines=len(lines),
+        budget=line_budget(geometry),
+        line_height=round(line_height, 3),
+        squeezed=line_height < geometry.line_height,
+        truncated=truncated,
+        overflow=overflow,
+        over_width=sum(len(line) > columns for line in lines),
+    )
+
+
+def layout_report(
+    *,
+    pages_by_num: Mapping[int, Page],
+    selected_pages: list[int],
+    columns: int,
+    space_len: int,
+    font_size: float,
+    line_height_multiplier: float,
+    fit_to_page: bool,
+    page_width_pt: float,
+    page_height_pt: float,
+    top_margin_pt: float,
+    bottom_margin_pt: float,
+    mission_style: MissionStyle,
+    layout_cache: LayoutCache | None = None,
+    profiler: Profiler | None = None,
+    **_pdf_options: Any,
+) -> list[PageFit]:
+    """Lay out `selected_pages` and measure each against the page's line budget.
+
+    Takes the same arguments as `render_pdf` and ignores those that only
+    affect drawing. Horizontal positions are not measured, so no font
+    metrics (and no ReportLab) are needed.
+    """
+    geometry = build_geometry(
+        font_name="",
+        font_size=font_size,
+        columns=columns,
+        left_margin_pt=None,
+        line_height_multiplier=line_height_multiplier,
+        fit_to_page=fit_to_page,
+        page_width_pt=page_width_pt,
+        page_height_pt=page_height_pt,
+        top_margin_pt=top_margin_pt,
+        bottom_margin_pt=bottom_margin_pt,
+        mission_style=mission_style,
+        char_width=0.0,
+    )
+    fits = []
+    with profile_stage(profiler, "dry_run"):
+        for page_num in selected_pages:
+            page = pages_by_num[page_num]
+            if layout_cache is not None:
+                page_layout = layout_cache.get_or_build(page, columns, space_len, mission_style)
+            else:
+                page_layout = layout_page(page, columns, space_len, mission_style)
+            fits.append(fit_page(page_num, page_layout, geometry, columns))
+    return fits
+
+
+def summarize(fits: Sequence[PageFit]) -> str:
+    squeezed = sum(fit.squeezed for fit in fits)
+    parts = [f"{len(fits)} pages", f"{squeezed} squeezed by fit_to_page"]
+    for label in ("truncated", "overflow", "over_width"):
+        counts = [getattr(fit, label) for fit in fits]
+        pages = sum(count > 0 for count in counts)
+        parts.append(f"{pages} with {label.replace('_', '-')} lines ({sum(counts)} lines)")
+    return ", ".join(parts)
+
+
+def format_report(fits: Sequence[PageFit]) -> str:
+    rows = [
+        f"{'page':>5} {'kind':<12} {'lines':>5} {'budget':>6} {'line_h':>7} "
+        f"{'truncated':>9} {'overflow':>8} {'wide':>4}"
+    ]
+    for fit in fits:
+        squeeze = "*" if fit.squeezed else " "
+        rows.append(
+            f"{fit.page:>5} {fit.kind:<12} {fit.lines:>5} {fit.budget:>6} "
+            f"{fit.line_height:>6.2f}{squeeze} {fit.truncated:>9} {fit.overflow:>8} "
+            f"{fit.over_width:>4}"
+        )
+    rows.append(summarize(fits))
+    return "\n".join(rows) + "\n"
+
+
+def write_report(fits: Sequence[PageFit], report: str) -> None:
+    """Write the table to stdout (`report` empty), or a JSON report (`-` for stdout)."""
+    if not report:
+        sys.stdout.write(format_report(fits))
+        return
+    data = {"summary": summarize(fits), "pages": [asdict(fit) for fit in fits]}
+    text = json.dumps(data, indent=2) + "\n"
+    if report == "-":
+        sys.stdout.write(text)
+    else:
+        with open(report, "w", encoding="utf-8") as file:
+            file.write(text)
+        print(summarize(fits))
@@ -0,0 +1,198 @@
+"""Plain-text and HTML page exports written from the same layout as the PDF."""
+
+from __future__ import annotations
+
+import html
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import IO, Protocol
+
+from config import MissionStyle
+from constants import TEXT_COL
+from layout import PAGE_KIND_REST_PERIOD, PageLayout, align_center, comm_prefix, layout_page
+from layout_cache import LayoutCache
+from model import BlockType, Page
+from profiling import Profiler, profile_stage
+
+TEXT_FORMATS = ("txt", "html")
+
+_HTML_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ margin: 2em auto; width: max-content; }}
+.page {{ margin-bottom: 2em; page-break-after: always; }}
+.page pre {{ margin: 0; font: 1em/1.2 "Courier New", Courier, monospace; }}
+.get {{ font-weight: bold; }}
+.speaker {{ font-weight: bold; }}
+.location {{ font-style: italic; }}
+</style>
+</head>
+<body>
+"""
+_HTML_TAIL = "</body>\n</html>\n"
+
+
+class PageSink(Protocol):
+    """Receives each laid-out page in order; `close()` finishes the output."""
+
+    def write_page(self, page: Page, page_layout: PageLayout) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def page_text_lines(page_layout: PageLayout, columns: int) -> list[str]:
+    """Lines of one page as monospaced text, centering what the PDF centers by geometry."""
+    lines = page_layout.lines
+    if page_layout.kind == PAGE_KIND_REST_PERIOD:
+        lines = [align_center(line, columns) for line in lines]
+    if page_layout.header_lines:
+        lines = page_layout.header_lines + lines
+    return [line.rstrip() for line in lines]
+
+
+def text_output_path(output_path: str, fmt: str) -> Path:
+    """`output/run.pdf` -> `output/run.txt` / `output/run.html`."""
+    return Path(output_path).with_suffix(f".{fmt}")
+
+
+class TextWriter:
+    """Writes pages as plain text, separated by form feeds."""
+
+    def __init__(self, path: str | Path, columns: int) -> None:
+        self.columns = columns
+        self.file: IO[str] = Path(path).open("w", encoding="utf-8")
+        self.pages = 0
+
+    def write_page(self, page: Page, page_layout: PageLayout) -> None:
+        if self.pages:
+            self.file.write("\f")
+        self.file.write("\n".join(page_text_lines(page_layout, self.columns)))
+        self.file.write("\n")
+        self.pages += 1
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _comm_markup(line: str, prefix: str, timestamp: str, speaker: str, location: str | None) -> str:
+    spans = [(0, len(timestamp), "get")]
+    speaker_start = prefix.find(speaker, len(timestamp)) if speaker else -1
+    if speaker_start >= 0:
+        spans.append((speaker_start, speaker_start + len(speaker), "speaker"))
+    if location:
+        location_start = prefix.rfind(f"({location})") + 1
+        spans.append((location_start, location_start + len(location), "location"))
+    spans.append((len(prefix), len(line), "text"))
+
+    parts = []
+    pos = 0
+    for start, end, css_class in spans:
+        if end <= start:
+            continue
+        parts.append(html.escape(line[pos:start]))
+        parts.append(f'<span class="{css_class}">{html.escape(line[start:end])}</span>')
+        pos = end
+    parts.append(html.escape(line[pos:]))
+    return "".join(parts)
+
+
+def _continuation_markup(line: str) -> str:
+    indent, text = line[:TEXT_COL], line[TEXT_COL:]
+    return f'{html.escape(indent)}<span class="text">{html.escape(text)}</span>'
+
+
+class HtmlWriter:
+    """Writes pages as one HTML document of `<pre>` sections.
+
+    Comm blocks keep their monospaced lines and wrap the timestamp, speaker,
+    location and text fields in spans, so the structure survives in markup.
+    """
+
+    def __init__(self, path: str | Path, columns: int, title: str) -> None:
+        self.columns = columns
+        self.file: IO[str] = Path(path).open("w", encoding="utf-8")
+        self.file.write(_HTML_HEAD.format(title=html.escape(title)))
+
+    def write_page(self, page: Page, page_layout: PageLayout) -> None:
+        lines = page_text_lines(page_layout, self.columns)
+        header = page.header
+        out = [
+            f'<section class="page {page_layout.kind}" id="page-{header.page}"'
+            f' data-tape="{html.escape(header.tape or "")}"><pre>'
+        ]
+        comm_blocks = (block for block in page.blocks if block.type == BlockType.COMM)
+        block = next(comm_blocks, None)
+        in_comm = False
+        for line in lines:
+            if block is not None:
+                timestamp = block.timestamp.strip()
+                speaker = block.speaker.strip()
+                prefix = comm_prefix(timestamp, speaker, block.location)
+                if line.startswith(prefix) or line == prefix.rstrip():
+                    if in_comm:
+                        out[-1] += "</span>"
+                    out.append(
+                        f'<span class="comm" data-get="{html.escape(timestamp)}">'
+                        + _comm_markup(line, prefix, timestamp, speaker, block.location)
+                    )
+                    in_comm = True
+                    block = next(comm_blocks, None)
+                    continue
+            if in_comm and line:
+                out.append(_continuation_markup(line))
+                continue
+            if in_comm:
+                out[-1] += "</span>"
+                in_comm = False
+            out.append(html.escape(line))
+        if in_comm:
+            out[-1] += "</span>"
+        out.append("</pre></section>\n")
+        self.file.write(out[0] + "\n".join(out[1:-1]) + out[-1])
+
+    def close(self) -> None:
+        self.file.write(_HTML_TAIL)
+        self.file.close()
+
+
+def open_text_sinks(formats: Sequence[str], output_path: str, columns: int) -> list[PageSink]:
+    """Open one writer per requested text format, next to the PDF path."""
+    sinks: list[PageSink] = []
+    for fmt in formats:
+        path = text_output_path(output_path, fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "txt":
+            sinks.append(TextWriter(path, columns))
+        elif fmt == "html":
+            sinks.append(HtmlWriter(path, columns, title=path.stem))
+    return sinks
+
+
+def export_pages(
+    *,
+    pages_by_num: Mapping[int, Page],
+    selected_pages: list[int],
+    columns: int,
+    space_len: int,
+    mission_style: MissionStyle,
+    sinks: Sequence[PageSink],
+    layout_cache: LayoutCache | None = None,
+    profiler: Profiler | None = None,
+    **_pdf_options: object,
+) -> None:
+    """Layout-only pass feeding `sinks`, used when no PDF is drawn in this process.
+
+    Other `render_pdf` arguments are accepted and ignored.
+    """
+    with profile_stage(profiler, "text_export"):
+        for page_num in selected_pages:
+            page = pages_by_num[page_num]
+            if layout_cache is not None:
+                page_layout = layout_cache.get_or_build(page, columns, space_len, mission_style)
+            else:
+                page_layout = layout_page(page, columns, space_len, mission_style)
+            for sink in sinks:
+                sink.write_page(page, page_layout)
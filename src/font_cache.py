@@ -0,0 +1,125 @@
+"""On-disk cache of TrueType character tables, so runs skip most of ReportLab's TTF parse."""
+
+from __future__ import annotations
+
+import json
+import os
+from fnmatch import fnmatch
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from weakref import WeakKeyDictionary
+
+from constants import FONT_CACHE_APP_DIR
+from fingerprint import stable_hash
+
+if TYPE_CHECKING:
+    from reportlab.pdfbase.ttfonts import TTFont
+
+# Bump when the cached tables change.
+FONT_CACHE_VERSION = 2
+
+
+def default_font_cache_dir() -> str:
+    """`$XDG_CACHE_HOME/<app>/fonts`, or `~/.cache/<app>/fonts`."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, FONT_CACHE_APP_DIR, "fonts")
+
+
+@cache
+def _cached_font_class() -> type[TTFont]:
+    from reportlab import rl_config
+    from reportlab.pdfbase.pdfmetrics import TypeFace
+    from reportlab.pdfbase.ttfonts import TTEncoding, TTFont, TTFontFace, TTFontFile
+
+    class CachedTTFontFace(TTFontFace):
+        """A `TTFontFace` parsed without character info, which comes from the cache instead."""
+
+        def __init__(self, filename: str, tables: dict[str, Any]) -> None:
+            TypeFace.__init__(self, None)
+            TTFontFile.__init__(self, filename, charInfo=0)
+            self.defaultWidth = tables["defaultWidth"]
+            self.charWidths = dict(tables["charWidths"])
+            self.charToGlyph = dict(tables["charToGlyph"])
+            self.glyphToChar = {glyph: chars for glyph, chars in tables["glyphToChar"]}
+            self.hmetrics = [tuple(metrics) for metrics in tables["hmetrics"]]
+            self.glyphPos = tables["glyphPos"]
+
+    class CachedTTFont(TTFont):
+        """A `TTFont` over a `CachedTTFontFace`; the rest is set up as in `TTFont.__init__`."""
+
+        def __init__(self, name: str, filename: str, tables: dict[str, Any]) -> None:
+            self.fontName = name
+            self.face = CachedTTFontFace(filename, tables)
+            self.encoding = TTEncoding()
+            self.state: WeakKeyDictionary[Any, Any] = WeakKeyDictionary()
+            self._asciiReadable = rl_config.ttfAsciiReadable
+            unshaped = rl_config.unShapedFontGlob or ()
+            self.shapable = not any(fnmatch(name, pattern) for pattern in unshaped)
+
+    return CachedTTFont
+
+
+def _char_tables(font: TTFont) -> dict[str, Any]:
+    face = font.face
+    return {
+        "defaultWidth": face.defaultWidth,
+        "charWidths": sorted(face.charWidths.items()),
+        "charToGlyph": sorted(face.charToGlyph.items()),
+        "glyphToChar": sorted(face.glyphToChar.items()),
+        "hmetrics": face.hmetrics,
+        "glyphPos": face.glyphPos,
+    }
+
+
+class FontCache:
+    """Stores the character tables of parsed `TTFont`s as JSON under `cache_dir`.
+
+    Only plain data is cached: glyph widths, the character map and glyph
+    offsets, which are most of ReportLab's parse time. The rest of the font is
+    parsed from the file on every load. Entries are keyed by the font's
+    absolute path, size and mtime plus the ReportLab version, so an edited font
+    gets a new entry. The default directory is per user; an entry planted by
+    someone else can at worst give wrong widths, never run code. Unreadable or
+    unwritable entries fall back to a full parse.
+    """
+
+    def __init__(self, cache_dir: str | None = None) -> None:
+        self.cache_dir = Path(cache_dir or default_font_cache_dir())
+
+    def key(self, font_path: str) -> str:
+        from reportlab import Version
+
+        stat = os.stat(font_path)
+        return stable_hash(
+            {
+                "version": FONT_CACHE_VERSION,
+                "reportlab": Version,
+                "path": os.path.abspath(font_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+        )
+
+    def load_ttfont(self, font_name: str, font_path: str) -> TTFont:
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        entry_path = self.cache_dir / f"{self.key(font_path)}.json"
+        try:
+            with entry_path.open(encoding="utf-8") as file:
+                tables = json.load(file)
+            return _cached_font_class()(font_name, font_path, tables)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            font = TTFont(font_name, font_path)
+            self._store(entry_path, font)
+            return font
+
+    def _store(self, entry_path: Path, font: TTFont) -> None:
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as file:
+                json.dump(_char_tables(font), file, separators=(",", ":"))
+            os.replace(tmp_path, entry_path)
+        except (OSError, TypeError, ValueError):
+            pass
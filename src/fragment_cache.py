@@ -0,0 +1,55 @@
+"""Content-addressed on-disk cache for rendered page fragments."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from config import MissionStyle
+from constants import DEFAULT_FRAGMENT_CACHE_MAX_MB
+from disk_cache import JsonFileCache
+from fingerprint import stable_hash
+from layout import is_note_page
+from model import Page
+
+# Bump when drawing code changes the page operators produced for identical inputs.
+FRAGMENT_CACHE_VERSION = 1
+
+
+class FragmentCache(JsonFileCache):
+    """Stores the finished PDF text operators of each rendered page.
+
+    Entries are keyed by a hash of the page dict plus a digest of the render
+    settings (geometry, font, size, faux bold, layout settings). A cached
+    fragment is replayed into the output page as-is, skipping layout and
+    drawing.
+    """
+
+    def __init__(
+        self, cache_dir: str, max_bytes: int = DEFAULT_FRAGMENT_CACHE_MAX_MB << 20
+    ) -> None:
+        super().__init__(cache_dir, max_bytes)
+
+    @staticmethod
+    def settings_digest(settings: dict[str, Any]) -> str:
+        from reportlab import Version
+
+        return stable_hash({"version": FRAGMENT_CACHE_VERSION, "reportlab": Version, **settings})
+
+    def key(self, page: Page, settings_digest: str, mission_style: MissionStyle) -> str:
+        return stable_hash(
+            {
+                "settings": settings_digest,
+                "page": page.to_dict(),
+                "note_page": is_note_page(page, mission_style),
+            }
+        )
+
+    def get(self, key: str) -> tuple[str, str] | None:
+        """Return the cached `(page kind, operators)` for `key`, if any."""
+        data = self.load(key)
+        if data is None:
+            return None
+        return data["kind"], data["code"]
+
+    def put(self, key: str, kind: str, code: str) -> None:
+        self.store(key, {"kind": kind, "code": code})
@@ -0,0 +1,205 @@
+"""Incremental PDF rebuilds driven by a per-page build manifest."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from config import MissionStyle
+from fingerprint import font_hash, stable_hash
+from layout import is_note_page
+from model import Page
+from pdf_tools import assemble_pages
+from profiling import profile_stage
+from renderer import render_pdf
+
+# Bump when the manifest format or the drawn output for identical inputs changes.
+MANIFEST_VERSION = 3
+
+# Page-number lists are not hashed with the config: their effect is recorded per page.
+PER_PAGE_STYLE_KEYS = (
+    "note_pages",
+    "rest_period_isolated_pages",
+    "rest_period_mixed_pages",
+    "footer_pages",
+)
+
+# render_pdf arguments that are not rendering settings.
+_NON_SETTING_KEYS = (
+    "pages_by_num",
+    "output_path",
+    "selected_pages",
+    "font_path",
+    "invariant",
+    "layout_cache",
+    "fragment_cache",
+    "profiler",
+)
+
+
+def manifest_path_for(output_path: str) -> str:
+    return str(Path(output_path).with_suffix(".manifest.json"))
+
+
+def page_hash(page: Page, mission_style: MissionStyle) -> str:
+    return stable_hash({"page": page.to_dict(), "note_page": is_note_page(page, mission_style)})
+
+
+def config_hash(render_kwargs: dict[str, Any]) -> str:
+    settings = {key: value for key, value in render_kwargs.items() if key not in _NON_SETTING_KEYS}
+    settings["mission_style"] = {
+        key: value
+        for key, value in render_kwargs["mission_style"].to_dict().items()
+        if key not in PER_PAGE_STYLE_KEYS
+    }
+    return stable_hash(settings)
+
+
+def build_manifest(render_kwargs: dict[str, Any]) -> dict[str, Any]:
+    pages_by_num = render_kwargs["pages_by_num"]
+    mission_style = render_kwargs["mission_style"]
+    return {
+        "version": MANIFEST_VERSION,
+        "config_hash": config_hash(render_kwargs),
+        "font_hash": font_hash(render_kwargs["font_path"]),
+        "pages": [
+            [page_num, page_hash(pages_by_num[page_num], mission_style)]
+            for page_num in render_kwargs["selected_pages"]
+        ],
+    }
+
+
+def load_manifest(manifest_path: str) -> dict[str, Any] | None:
+    try:
+        with open(manifest_path, encoding="utf-8") as file:
+            manifest: dict[str, Any] = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _output_stat(output_path: str) -> list[int] | None:
+    try:
+        stat = os.stat(output_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def write_manifest(manifest_path: str, manifest: dict[str, Any], output_path: str) -> None:
+    """Write `manifest` for the PDF just written to `output_path`, recording its size and
+    mtime so a PDF later replaced by another render is not mistaken for it."""
+    manifest = {**manifest, "output": _output_stat(output_path)}
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=1)
+    os.replace(tmp_path, manifest_path)
+
+
+def describes_output(manifest: dict[str, Any] | None, output_path: str) -> bool:
+    """True when `manifest` was written for the PDF currently at `output_path`."""
+    return manifest is not None and manifest.get("output") == _output_stat(output_path)
+
+
+def is_up_to_date(render_kwargs: dict[str, Any]) -> bool:
+    """True when the output PDF is the one its manifest describes, and the manifest matches
+    these arguments exactly."""
+    output_path = render_kwargs["output_path"]
+    previous = load_manifest(manifest_path_for(output_path))
+    if previous is None or not describes_output(previous, output_path):
+        return False
+    previous = {key: value for key, value in previous.items() if key != "output"}
+    return previous == build_manifest(render_kwargs)
+
+
+def _reusable_pages(
+    manifest: dict[str, Any], previous: dict[str, Any] | None, output_path: str
+) -> dict[int, tuple[str, int]]:
+    """Page number -> (content hash, index in the existing PDF) for pages it can supply."""
+    if (
+        previous is None
+        or not describes_output(previous, output_path)
+        or previous["config_hash"] != manifest["config_hash"]
+        or previous["font_hash"] != manifest["font_hash"]
+    ):
+        return {}
+    return {page_num: (digest, index) for index, (page_num, digest) in enumerate(previous["pages"])}
+
+
+def _stale_pages(manifest: dict[str, Any], reusable: dict[int, tuple[str, int]]) -> list[int]:
+    return [
+        page_num
+        for page_num, digest in manifest["pages"]
+        if reusable.get(page_num, ("", -1))[0] != digest
+    ]
+
+
+def changed_pages(manifest: dict[str, Any], previous: dict[str, Any]) -> list[int]:
+    """Pages of `manifest` whose hash differs from `previous` (all of them after a
+    config or font change)."""
+    if (
+        previous["config_hash"] != manifest["config_hash"]
+        or previous["font_hash"] != manifest["font_hash"]
+    ):
+        return [page_num for page_num, _ in manifest["pages"]]
+    hashes = {page_num: digest for page_num, digest in previous["pages"]}
+    return [page_num for page_num, digest in manifest["pages"] if hashes.get(page_num) != digest]
+
+
+def render_pdf_incremental(
+    render: Callable[..., object] = render_pdf,
+    **render_kwargs: Any,
+) -> list[int]:
+    """Render `render_pdf` arguments, reusing unchanged pages of the previous output.
+
+    Pages whose content hash matches the manifest next to the existing PDF are
+    copied from it; the others are rendered and spliced in. Any change to the
+    config or font hash, a missing PDF/manifest, or a PDF replaced since the
+    manifest was written (size or mtime changed) triggers a full render.
+    `render` is called with `render_pdf` arguments (for example a `--jobs`
+    wrapper). Returns the page numbers that were rendered.
+    """
+    output_path = render_kwargs["output_path"]
+    profiler = render_kwargs.get("profiler")
+    manifest_path = manifest_path_for(output_path)
+    with profile_stage(profiler, "build_manifest"):
+        manifest = build_manifest(render_kwargs)
+    previous = load_manifest(manifest_path)
+
+    order = [page_num for page_num, _ in manifest["pages"]]
+    reusable = _reusable_pages(manifest, previous, output_path)
+    previous_order = sorted(reusable, key=lambda page_num: reusable[page_num][1])
+    stale = _stale_pages(manifest, reusable)
+
+    if len(stale) == len(order):
+        render(**render_kwargs)
+    elif stale or order != previous_order:
+        with tempfile.TemporaryDirectory(prefix="transcript-incremental-") as tmp_dir:
+            fresh_path = os.path.join(tmp_dir, "fresh.pdf")
+            if stale:
+                fresh_kwargs = dict(render_kwargs)
+                fresh_kwargs["pages_by_num"] = {
+                    page_num: render_kwargs["pages_by_num"][page_num] for page_num in stale
+                }
+                fresh_kwargs["output_path"] = fresh_path
+                fresh_kwargs["selected_pages"] = stale
+                render(**fresh_kwargs)
+            fresh_index = {page_num: index for index, page_num in enumerate(stale)}
+
+            picks = []
+            for page_num in order:
+                if page_num in fresh_index:
+                    picks.append((fresh_path, fresh_index[page_num]))
+                else:
+                    picks.append((output_path, reusable[page_num][1]))
+            with profile_stage(profiler, "splice_pages"):
+                assemble_pages(picks, output_path)
+
+    write_manifest(manifest_path, manifest, output_path)
+    return stale
@@ -2,24 +2,40 @@
 
 from __future__ import annotations
 
+import gzip
+import io
 import json
+import mmap
 import os
+import re
+from collections.abc import Container, Iterable, Iterator, Mapping
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
+
+from constants import GZIP_LEVEL, TRANSCRIPT_READ_CHUNK, ZSTD_LEVEL
+from model import Page, PageHeader
+from page_search import PageSearchIndex, build_search_index
 
 INPUT_DIR = Path("input")
 OUTPUT_DIR = Path("output")
 
+PAGE_INDEX_VERSION = 3
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
 
 def resolve_input_json_path(json_path: str) -> str:
+    """Find `json_path`, then `input/<json_path>`, then `.gz`/`.zst` copies of either."""
     candidate = Path(json_path)
-    if candidate.is_file():
-        return str(candidate)
-
+    bases = [candidate]
     if not candidate.is_absolute():
-        fallback = INPUT_DIR / candidate
-        if fallback.is_file():
-            return str(fallback)
+        bases.append(INPUT_DIR / candidate)
+    for suffix in ("", *COMPRESSED_SUFFIXES):
+        for base in bases:
+            path = base.with_name(base.name + suffix)
+            if path.is_file():
+                return str(path)
 
     return str(candidate)
 
@@ -32,19 +48,410 @@ def resolve_output_pdf_path(output_path: str) -> str:
     return str(candidate)
 
 
-def load_pages(json_path: str) -> dict[int, dict[str, Any]]:
+def _require_zstandard() -> Any:
+    try:
+        import zstandard
+    except ModuleNotFoundError as exc:  # pragma: no cover - depends on environment
+        raise RuntimeError(
+            "zstandard is required for .zst transcripts; install it with `pip install -e .[zstd]`."
+        ) from exc
+    return zstandard
+
+
+def transcript_format(json_path: str) -> tuple[str, str]:
+    """`run.jsonl.gz` -> `("jsonl", "gz")`; `run.json` -> `("json", "")`."""
+    path = Path(json_path)
+    compression = ""
+    if path.suffix in COMPRESSED_SUFFIXES:
+        compression = path.suffix[1:]
+        path = path.with_suffix("")
+    return ("jsonl" if path.suffix == ".jsonl" else "json"), compression
+
+
+def is_streamed_transcript(json_path: str) -> bool:
+    """True for compressed or JSON Lines transcripts, which are decoded in one pass."""
+    return transcript_format(json_path) != ("json", "")
+
+
+def open_transcript(json_path: str, mode: str = "r") -> IO[str]:
+    """Open a transcript as UTF-8 text (`mode` `r` or `w`), compressing by file suffix."""
+    _, compression = transcript_format(json_path)
+    if compression == "gz":
+        return io.TextIOWrapper(
+            gzip.GzipFile(json_path, mode, compresslevel=GZIP_LEVEL), encoding="utf-8"
+        )
+    if compression == "zst":
+        zstandard = _require_zstandard()
+        cctx = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if mode == "w" else None
+        file: IO[str] = zstandard.open(json_path, f"{mode}t", cctx=cctx, encoding="utf-8")
+        return file
+    return open(json_path, mode, encoding="utf-8")
+
+
+class _TextStream:
+    """A read buffer for `raw_decode` scanning of a JSON document too large to hold whole.
+
+    Text is read in chunks; consumed text is dropped when more is read, so the
+    buffer holds about one chunk plus the value being decoded.
+    """
+
+    def __init__(self, file: IO[str], chunk_size: int = TRANSCRIPT_READ_CHUNK) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def fill(self) -> bool:
+        data = self.file.read(self.chunk_size)
+        if not data:
+            return False
+        self.text = self.text[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or "" at the end of the input."""
+        while True:
+            self.pos = _skip_ws(self.text, self.pos)
+            if self.pos < len(self.text) or not self.fill():
+                return self.text[self.pos : self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in transcript JSON")
+        self.pos += 1
+
+    def skip_comma(self) -> None:
+        if self.peek() == ",":
+            self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number ending the buffer may continue in the next chunk.
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_json_records(file: IO[str]) -> Iterator[dict[str, Any]]:
+    """Stream a `{..., "pages": {...}}` transcript as records, in file order.
+
+    Each page object is one record; every other top-level field is a
+    `{key: value}` record of its own.
+    """
+    stream = _TextStream(file)
+    stream.expect("{")
+    while stream.peek() not in ("}", ""):
+        key = stream.value()
+        stream.expect(":")
+        if key == "pages":
+            stream.expect("{")
+            while stream.peek() != "}":
+                stream.value()
+                stream.expect(":")
+                yield stream.value()
+                stream.skip_comma()
+            stream.expect("}")
+        else:
+            yield {key: stream.value()}
+        stream.skip_comma()
+
+
+def _iter_jsonl_records(file: IO[str]) -> Iterator[dict[str, Any]]:
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_transcript_records(json_path: str) -> Iterator[dict[str, Any]]:
+    """Page objects (records with a `"header"`) and document field records, in file order."""
+    fmt, _ = transcript_format(json_path)
+    with open_transcript(json_path) as file:
+        if fmt == "jsonl":
+            yield from _iter_jsonl_records(file)
+        else:
+            yield from _iter_json_records(file)
+
+
+def iter_transcript_pages(json_path: str, wanted: Container[int] | None = None) -> Iterator[Page]:
+    """Decode numbered pages one at a time; pages not in `wanted` are skipped unbuilt."""
+    for record in iter_transcript_records(json_path):
+        header = record.get("header")
+        if not isinstance(header, dict):
+            continue
+        page_num = header.get("page")
+        if page_num is None or (wanted is not None and page_num not in wanted):
+            continue
+        yield Page.from_dict(record)
+
+
+def convert_transcript(json_path: str, out_path: str) -> int:
+    """Rewrite a transcript as JSON Lines (`.jsonl`, `.jsonl.gz` or `.jsonl.zst`).
+
+    Document fields and pages are written one record per line in source order,
+    streaming, so the source is never held in memory whole. Returns the page count.
+    """
+    if transcript_format(out_path)[0] != "jsonl":
+        raise ValueError(f"Convert writes JSON Lines (.jsonl[.gz|.zst]), not {out_path!r}")
+    pages = 0
+    tmp_path = f"{out_path}.{os.getpid()}.tmp{Path(out_path).suffix}"
+    with open_transcript(tmp_path, "w") as file:
+        for record in iter_transcript_records(json_path):
+            file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            file.write("\n")
+            pages += "header" in record
+    os.replace(tmp_path, out_path)
+    return pages
+
+
+def _load_pages_eager(json_path: str) -> dict[int, Page]:
     with open(json_path, encoding="utf-8") as file:
         data = json.load(file)
 
-    pages_by_num: dict[int, dict[str, Any]] = {}
-    for page in data["pages"].values():
-        page_num = page.get("header", {}).get("page")
-        if page_num is None:
+    pages_by_num: dict[int, Page] = {}
+    for page_data in data["pages"].values():
+        page = Page.from_dict(page_data)
+        if page.header.page is None:
             continue
-        pages_by_num[page_num] = page
+        pages_by_num[page.header.page] = page
     return pages_by_num
 
 
+def page_index_path(json_path: str) -> str:
+    return str(Path(json_path).with_suffix(".index.json"))
+
+
+def _skip_ws(text: str, idx: int) -> int:
+    match = _WHITESPACE.match(text, idx)
+    return match.end() if match else idx
+
+
+def _expect(text: str, idx: int, char: str) -> int:
+    idx = _skip_ws(text, idx)
+    if text[idx : idx + 1] != char:
+        raise ValueError(f"Expected {char!r} at offset {idx}")
+    return idx + 1
+
+
+def _scan_transcript(text: str) -> tuple[dict[str, Any], list[tuple[int, int, dict[str, Any]]]]:
+    """Walk the top-level object, returning header fields and page value spans.
+
+    Spans are `(start, end, page)`: character offsets of each value under `"pages"`
+    and the decoded page.
+    """
+    decoder = json.JSONDecoder()
+    fields: dict[str, Any] = {}
+    spans: list[tuple[int, int, dict[str, Any]]] = []
+
+    def scan_key(idx: int) -> tuple[str, int]:
+        idx = _skip_ws(text, idx)
+        key, idx = decoder.raw_decode(text, idx)
+        if not isinstance(key, str):
+            raise ValueError(f"Expected object key at offset {idx}")
+        return key, _skip_ws(text, _expect(text, idx, ":"))
+
+    idx = _expect(text, 0, "{")
+    while text[_skip_ws(text, idx) : _skip_ws(text, idx) + 1] not in ("}", ""):
+        key, idx = scan_key(idx)
+        if key == "pages":
+            idx = _expect(text, idx, "{")
+            while text[_skip_ws(text, idx)] != "}":
+                _, start = scan_key(idx)
+                page, idx = decoder.raw_decode(text, start)
+                spans.append((start, idx, page))
+                idx = _skip_ws(text, idx)
+                if text[idx] == ",":
+                    idx += 1
+            idx = _expect(text, idx, "}")
+        else:
+            fields[key], idx = decoder.raw_decode(text, idx)
+        idx = _skip_ws(text, idx)
+        if text[idx : idx + 1] == ",":
+            idx += 1
+    return fields, spans
+
+
+def build_page_index(json_path: str) -> dict[str, Any]:
+    stat = os.stat(json_path)
+    with open(json_path, "rb") as file:
+        raw = file.read()
+    text = raw.decode("utf-8")
+    fields, spans = _scan_transcript(text)
+
+    # Convert character offsets to byte offsets (identity for ASCII-only files).
+    ascii_only = len(raw) == len(text)
+    char_pos = 0
+    byte_pos = 0
+
+    def to_bytes(pos: int) -> int:
+        nonlocal char_pos, byte_pos
+        if ascii_only:
+            return pos
+        byte_pos += len(text[char_pos:pos].encode("utf-8"))
+        char_pos = pos
+        return byte_pos
+
+    pages: dict[str, list[Any]] = {}
+    for start, end, page in spans:
+        byte_start = to_bytes(start)
+        byte_end = to_bytes(end)
+        header = page.get("header", {})
+        page_num = header.get("page")
+        if page_num is None:
+            continue
+        pages[str(page_num)] = [byte_start, byte_end - byte_start, header]
+
+    return {
+        "version": PAGE_INDEX_VERSION,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "fields": fields,
+        "pages": pages,
+        "search": build_search_index(Page.from_dict(page) for _, _, page in spans),
+    }
+
+
+def load_page_index(json_path: str) -> dict[str, Any]:
+    """Return the page index sidecar for `json_path`, rebuilding it when stale."""
+    index_path = page_index_path(json_path)
+    stat = os.stat(json_path)
+    try:
+        with open(index_path, encoding="utf-8") as file:
+            cached: dict[str, Any] = json.load(file)
+        if (
+            cached.get("version") == PAGE_INDEX_VERSION
+            and cached.get("source_size") == stat.st_size
+            and cached.get("source_mtime_ns") == stat.st_mtime_ns
+        ):
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    index = build_page_index(json_path)
+    try:
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(index, file, separators=(",", ":"))
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass
+    return index
+
+
+class IndexedPages(Mapping[int, Page]):
+    """Read-only `pages_by_num` mapping that decodes pages on first access.
+
+    Page numbers, order and headers come from the page index; page bodies are
+    sliced from a memory map of the source file and decoded only when read.
+    The spans are only valid for the file the index was built from, so every
+    decode first checks that its size and mtime are unchanged. `close()`
+    releases the map.
+    """
+
+    def __init__(self, json_path: str, index: dict[str, Any]) -> None:
+        self.json_path = json_path
+        self.source = (index["source_size"], index["source_mtime_ns"])
+        self.fields: dict[str, Any] = index["fields"]
+        self._spans = {int(num): (entry[0], entry[1]) for num, entry in index["pages"].items()}
+        self._headers = {
+            int(num): PageHeader.from_dict(entry[2]) for num, entry in index["pages"].items()
+        }
+        self._decoded: dict[int, Page] = {}
+        self.search = PageSearchIndex(index["search"])
+        with open(json_path, "rb") as file:
+            self._check_source(os.fstat(file.fileno()))
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __getitem__(self, page_num: int) -> Page:
+        page = self._decoded.get(page_num)
+        if page is None:
+            page = self.decode(page_num)
+            self._decoded[page_num] = page
+        return page
+
+    def decode(self, page_num: int) -> Page:
+        """Decode one page without keeping it, for single-pass streaming reads."""
+        offset, length = self._spans[page_num]
+        self._check_source(os.stat(self.json_path))
+        return Page.from_dict(json.loads(self._map[offset : offset + length]))
+
+    def __contains__(self, page_num: object) -> bool:
+        return page_num in self._spans
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def header(self, page_num: int) -> PageHeader:
+        return self._headers[page_num]
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _check_source(self, stat: os.stat_result) -> None:
+        if (stat.st_size, stat.st_mtime_ns) != self.source:
+            raise RuntimeError(
+                f"{self.json_path} changed since its page index was read; load its pages again."
+            )
+
+
+def load_pages(json_path: str, wanted: Container[int] | None = None) -> Mapping[int, Page]:
+    """Load a transcript's pages by number.
+
+    Plain JSON is memory-mapped through the page index and decoded lazily.
+    Compressed and JSON Lines transcripts are decoded in one streaming pass
+    that keeps only `wanted` pages (all pages when None).
+    """
+    if is_streamed_transcript(json_path):
+        pages_by_num: dict[int, Page] = {}
+        for page in iter_transcript_pages(json_path, wanted):
+            if page.header.page is not None:
+                pages_by_num[page.header.page] = page
+        return pages_by_num
+    try:
+        index = load_page_index(json_path)
+        if index["pages"]:
+            return IndexedPages(json_path, index)
+    except (ValueError, KeyError):
+        pass
+    return _load_pages_eager(json_path)
+
+
+def iter_pages(pages_by_num: Mapping[int, Page], page_nums: Iterable[int]) -> Iterator[Page]:
+    """Yield pages in order; pages of an `IndexedPages` are decoded but not retained."""
+    if isinstance(pages_by_num, IndexedPages):
+        for page_num in page_nums:
+            yield pages_by_num._decoded.get(page_num) or pages_by_num.decode(page_num)
+    else:
+        for page_num in page_nums:
+            yield pages_by_num[page_num]
+
+
+def close_pages(pages_by_num: Mapping[int, Page]) -> None:
+    """Release the memory map behind `pages_by_num`, if it has one."""
+    if isinstance(pages_by_num, IndexedPages):
+        pages_by_num.close()
+
+
+def page_search_index(pages_by_num: Mapping[int, Page]) -> PageSearchIndex:
+    """GET/tape/speaker index of `pages_by_num`, from the page index sidecar when available."""
+    if isinstance(pages_by_num, IndexedPages):
+        return pages_by_num.search
+    return PageSearchIndex(build_search_index(pages_by_num.values()))
+
+
+@lru_cache(maxsize=32)
 def locate_font(path_hint: str) -> str:
     hint_path = Path(path_hint).expanduser()
     if path_hint and hint_path.is_file():
@@ -2,15 +2,51 @@
 
 from __future__ import annotations
 
-from typing import Any
+from dataclasses import dataclass
+from functools import lru_cache
 
+from config import MissionStyle
 from constants import (
     CONTINUATION_COL,
     META_COL,
     SPEAKER_COL,
     TEXT_COL,
     TIMESTAMP_COL,
+    WRAP_CACHE_SIZE,
 )
+from model import Block, BlockType, MetaType, Page
+
+_COMM_CONTINUATION_PREFIX = " " * TEXT_COL
+
+PAGE_KIND_NORMAL = "normal"
+PAGE_KIND_NOTE = "note"
+PAGE_KIND_REST_PERIOD = "rest_period"
+
+# MissionStyle fields that change the generated lines (note_pages only matters per page).
+LAYOUT_STYLE_KEYS = (
+    "title_line",
+    "goss_line",
+    "annotation_top_blank_lines",
+    "end_of_tape_indent_col",
+    "center_rest_period_text",
+    "rest_period_keep_header",
+    "rest_period_only_when_no_comm",
+    "note_heading",
+    "note_block_columns",
+)
+
+
+@dataclass(frozen=True)
+class PageLayout:
+    """Monospaced lines for one page, ready to draw.
+
+    `header_lines` are drawn from the top margin; `lines` hold the page body
+    (the whole page, header included, for normal pages).
+    """
+
+    kind: str
+    header_lines: list[str]
+    lines: list[str]
 
 
 def parse_pages_arg(pages_arg: str) -> list[int]:
@@ -33,33 +69,42 @@ def parse_pages_arg(pages_arg: str) -> list[int]:
     return pages
 
 
-def wrap_text(text: str, width: int, space_len: int = 1) -> list[str]:
+@lru_cache(maxsize=WRAP_CACHE_SIZE)
+def _wrap_words(text: str, width: int, space_len: int) -> tuple[str, ...]:
     if width <= 0:
-        return [text]
+        return (text,)
 
     words = text.split()
     if not words:
-        return []
+        return ()
 
+    separator = " " * space_len
     lines: list[str] = []
-    current: list[str] = []
-    current_len = 0
-
-    for word in words:
-        word_len = len(word)
-        tentative_len = word_len if not current else current_len + space_len + word_len
-        if tentative_len <= width or not current:
-            current.append(word)
+    line_start = 0
+    current_len = len(words[0])
+
+    for index in range(1, len(words)):
+        word_len = len(words[index])
+        tentative_len = current_len + space_len + word_len
+        if tentative_len <= width:
             current_len = tentative_len
             continue
-        lines.append((" " * space_len).join(current))
-        current = [word]
+        lines.append(separator.join(words[line_start:index]))
+        line_start = index
         current_len = word_len
 
-    if current:
-        lines.append((" " * space_len).join(current))
+    lines.append(separator.join(words[line_start:]))
+    return tuple(lines)
 
-    return lines
+
+def wrap_text(text: str, width: int, space_len: int = 1) -> list[str]:
+    """Greedy word wrap, memoized on `(text, width, space_len)`."""
+    return list(_wrap_words(text, width, space_len))
+
+
+def clear_wrap_cache() -> None:
+    _wrap_words.cache_clear()
+    _speaker_field.cache_clear()
 
 
 def align_center(line: str, width: int) -> str:
@@ -69,32 +114,32 @@ def align_center(line: str, width: int) -> str:
     return " " * pad + line
 
 
-def format_comm(block: dict[str, Any], columns: int, wrap_space_len: int = 1) -> list[str]:
-    timestamp = block.get("timestamp", "").strip()
-    speaker = block.get("speaker", "").strip()
-    text = block.get("text", "").strip()
-    location = block.get("location")
-
-    prefix = ""
-    if timestamp:
-        prefix += timestamp
-    if len(prefix) < SPEAKER_COL:
-        prefix += " " * (SPEAKER_COL - len(prefix))
-    prefix += speaker
-    if len(prefix) < TEXT_COL:
-        prefix += " " * (TEXT_COL - len(prefix))
+@lru_cache(maxsize=4096)
+def _speaker_field(speaker: str, location: str | None) -> str:
+    field = speaker.ljust(TEXT_COL - SPEAKER_COL)
+    if location:
+        field += f"({location}) "
+    return field
+
+
+def comm_prefix(timestamp: str, speaker: str, location: str | None) -> str:
+    if len(timestamp) <= SPEAKER_COL:
+        return timestamp.ljust(SPEAKER_COL) + _speaker_field(speaker, location)
+    # An overlong timestamp pushes the speaker right; the text column still pads to TEXT_COL.
+    prefix = (timestamp + speaker).ljust(TEXT_COL)
     if location:
         prefix += f"({location}) "
+    return prefix
 
-    available = columns - len(prefix)
-    wrapped = wrap_text(text, available, space_len=wrap_space_len)
+
+def format_comm(block: Block, columns: int, wrap_space_len: int = 1) -> list[str]:
+    prefix = comm_prefix(block.timestamp.strip(), block.speaker.strip(), block.location)
+    wrapped = _wrap_words(block.text.strip(), columns - len(prefix), wrap_space_len)
     if not wrapped:
         return [prefix.rstrip()]
 
     lines = [prefix + wrapped[0]]
-    if len(wrapped) > 1:
-        continuation_prefix = " " * TEXT_COL
-        lines.extend(continuation_prefix + part for part in wrapped[1:])
+    lines.extend(_COMM_CONTINUATION_PREFIX + part for part in wrapped[1:])
     return lines
 
 
@@ -118,49 +163,44 @@ def format_footer(text: str, columns: int, wrap_space_len: int = 1) -> list[str]
     return [prefix + line for line in wrapped]
 
 
+def build_header_lines(page: Page, columns: int, mission_style: MissionStyle) -> list[str]:
+    """Title (on Apollo title pages), GOSS net and tape line, and page number.
+
+    Lines come from the style's `HeaderTemplate`; only the tape and page
+    number fields are formatted per page.
+    """
+    lines: list[str] = []
+    header = page.header
+    template = mission_style.header_template(columns)
+    if header.is_apollo_title:
+        lines.extend(template.title_lines)
+    if header.tape:
+        lines.append(template.goss_tape_line(header.tape))
+        lines.append(template.page_line(header.page))
+        lines.extend(["", ""])
+    return lines
+
+
 def build_page_lines(
-    page: dict[str, Any],
+    page: Page,
     columns: int,
     space_len: int,
-    mission_style: dict[str, Any],
+    mission_style: MissionStyle,
 ) -> list[str]:
-    lines: list[str] = []
-    header = page.get("header", {})
-    tape = header.get("tape")
-    page_num = header.get("page")
-    is_title = header.get("is_apollo_title")
-    title_line = str(mission_style.get("title_line", "AIR-TO-GROUND VOICE TRANSCRIPTION"))
-    goss_line_text = str(mission_style.get("goss_line", "(GOSS NET 1)"))
-    annotation_top_blank_lines = int(mission_style.get("annotation_top_blank_lines", 1))
-    end_of_tape_indent_col = int(mission_style.get("end_of_tape_indent_col", TIMESTAMP_COL))
-
-    if tape or is_title:
-        if is_title:
-            lines.extend([align_center(title_line, columns), "", ""])
-        if tape:
-            tape_str = f"Tape {tape}"
-            if len(goss_line_text) + len(tape_str) + 1 <= columns:
-                goss_line = (
-                    goss_line_text
-                    + " " * (columns - len(goss_line_text) - len(tape_str))
-                    + tape_str
-                )
-            else:
-                goss_line = goss_line_text
-            lines.append(goss_line)
-            lines.append(f"Page {page_num}".rjust(columns))
-            lines.extend(["", ""])
+    lines = build_header_lines(page, columns, mission_style)
+    annotation_top_blank_lines = mission_style.annotation_top_blank_lines
+    end_of_tape_indent_col = mission_style.end_of_tape_indent_col
 
-    for block in page.get("blocks", []):
-        block_type = block.get("type")
-        text = block.get("text", "")
+    for block in page.blocks:
+        block_type = block.type
+        text = block.text
 
-        if block_type == "comm":
+        if block_type == BlockType.COMM:
             lines.extend(format_comm(block, columns, wrap_space_len=space_len))
             lines.append("")
             continue
 
-        if block_type == "annotation":
+        if block_type == BlockType.ANNOTATION:
             if lines and lines[-1] != "":
                 lines.append("")
             lines.extend([""] * annotation_top_blank_lines)
@@ -168,9 +208,8 @@ def build_page_lines(
             lines.extend(["", ""])
             continue
 
-        if block_type == "meta":
-            meta_type = block.get("meta_type", "")
-            if meta_type == "end_of_tape" or text.strip() == "END OF TAPE":
+        if block_type == BlockType.META:
+            if block.meta_type == MetaType.END_OF_TAPE or text.strip() == "END OF TAPE":
                 lines.extend(
                     format_indented(
                         text,
@@ -184,12 +223,12 @@ def build_page_lines(
             lines.append("")
             continue
 
-        if block_type == "continuation":
+        if block_type == BlockType.CONTINUATION:
             lines.extend(format_indented(text, CONTINUATION_COL, columns, wrap_space_len=space_len))
             lines.append("")
             continue
 
-        if block_type == "footer":
+        if block_type == BlockType.FOOTER:
             lines.extend(format_footer(text, columns, wrap_space_len=space_len))
             lines.append("")
             continue
@@ -198,3 +237,80 @@ def build_page_lines(
         lines.append("")
 
     return lines
+
+
+def is_note_page(page: Page, mission_style: MissionStyle) -> bool:
+    return page.header.page in mission_style.note_pages
+
+
+def is_centered_rest_period_page(page: Page, mission_style: MissionStyle) -> bool:
+    if page.header.page_type != "rest_period":
+        return False
+    if not mission_style.center_rest_period_text:
+        return False
+    if not mission_style.rest_period_only_when_no_comm:
+        return True
+    return all(block.type != BlockType.COMM for block in page.blocks)
+
+
+def build_rest_period_lines(page: Page, columns: int, space_len: int) -> list[str]:
+    blocks = page.blocks
+    texts: list[str] = []
+    for block in blocks:
+        if block.meta_type == MetaType.REST_PERIOD:
+            text = block.text.strip()
+            if text:
+                texts.append(text)
+    if not texts:
+        for block in blocks:
+            text = block.text.strip()
+            if text:
+                texts.append(text)
+
+    lines: list[str] = []
+    for text in texts:
+        wrapped = wrap_text(text, columns, space_len=space_len)
+        lines.extend(wrapped)
+    return lines
+
+
+def build_note_lines(
+    page: Page, columns: int, space_len: int, mission_style: MissionStyle
+) -> list[str]:
+    heading = mission_style.note_heading.strip()
+    lines: list[str] = [align_center(heading, columns), ""]
+    block_columns = max(1, min(columns, mission_style.note_block_columns))
+    body_texts = []
+    for block in page.blocks:
+        text = block.text.strip()
+        if text:
+            body_texts.append(text)
+    for text in body_texts:
+        wrapped = wrap_text(text, block_columns, space_len=space_len)
+        lines.extend(align_center(line, columns) for line in wrapped)
+    return lines
+
+
+def layout_page(
+    page: Page, columns: int, space_len: int, mission_style: MissionStyle
+) -> PageLayout:
+    if is_note_page(page, mission_style):
+        return PageLayout(
+            kind=PAGE_KIND_NOTE,
+            header_lines=build_header_lines(page, columns, mission_style),
+            lines=build_note_lines(page, columns, space_len, mission_style),
+        )
+    if is_centered_rest_period_page(page, mission_style):
+        header_lines: list[str] = []
+        if mission_style.rest_period_keep_header:
+            header_lines = build_header_lines(page, columns, mission_style)
+        return PageLayout(
+            kind=PAGE_KIND_REST_PERIOD,
+            header_lines=header_lines,
+            lines=build_rest_period_lines(page, columns, space_len),
+        )
+    return PageLayout(
+        kind=PAGE_KIND_NORMAL,
+        header_lines=[],
+        lines=build_page_lines(page, columns, space_len, mission_style),
+    )
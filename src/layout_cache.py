@@ -0,0 +1,63 @@
+"""Content-addressed on-disk cache for page layouts."""
+
+from __future__ import annotations
+
+from config import MissionStyle
+from constants import DEFAULT_LAYOUT_CACHE_MAX_MB
+from disk_cache import JsonFileCache
+from fingerprint import stable_hash
+from layout import LAYOUT_STYLE_KEYS, PageLayout, is_note_page, layout_page
+from model import Page
+
+# Bump when layout code changes the lines produced for identical inputs.
+LAYOUT_CACHE_VERSION = 1
+
+
+class LayoutCache(JsonFileCache):
+    """Stores finished `PageLayout` line lists as small JSON files.
+
+    Entries are keyed by a hash of the page dict plus the settings that affect
+    its lines.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_LAYOUT_CACHE_MAX_MB << 20) -> None:
+        super().__init__(cache_dir, max_bytes)
+
+    def key(self, page: Page, columns: int, space_len: int, mission_style: MissionStyle) -> str:
+        return stable_hash(
+            {
+                "version": LAYOUT_CACHE_VERSION,
+                "page": page.to_dict(),
+                "columns": columns,
+                "space_len": space_len,
+                "style": {key: getattr(mission_style, key) for key in LAYOUT_STYLE_KEYS},
+                "note_page": is_note_page(page, mission_style),
+            }
+        )
+
+    def get_or_build(
+        self,
+        page: Page,
+        columns: int,
+        space_len: int,
+        mission_style: MissionStyle,
+    ) -> PageLayout:
+        key = self.key(page, columns, space_len, mission_style)
+        data = self.load(key)
+        if data is not None:
+            return PageLayout(
+                kind=data["kind"],
+                header_lines=data["header_lines"],
+                lines=data["lines"],
+            )
+
+        page_layout = layout_page(page, columns, space_len, mission_style)
+        self.store(
+            key,
+            {
+                "kind": page_layout.kind,
+                "header_lines": page_layout.header_lines,
+                "lines": page_layout.lines,
+            },
+        )
+        return page_layout
@@ -0,0 +1,162 @@
+"""Compact typed page/block model for transcript JSON."""
+
+from __future__ import annotations
+
+import sys
+from enum import StrEnum
+from typing import Any
+
+
+class BlockType(StrEnum):
+    COMM = "comm"
+    ANNOTATION = "annotation"
+    META = "meta"
+    CONTINUATION = "continuation"
+    FOOTER = "footer"
+
+
+class MetaType(StrEnum):
+    END_OF_TAPE = "end_of_tape"
+    REST_PERIOD = "rest_period"
+    LUNAR_REV = "lunar_rev"
+    TRANSCRIPT_HEADER = "transcript_header"
+
+
+_BLOCK_TYPES = {member.value: member for member in BlockType}
+_META_TYPES = {member.value: member for member in MetaType}
+
+
+def _intern(value: Any) -> str | None:
+    return None if value is None else sys.intern(str(value))
+
+
+def _block_type(value: Any) -> BlockType | str | None:
+    # Unknown values stay interned strings so upstream additions still render (as text).
+    if value is None:
+        return None
+    return _BLOCK_TYPES.get(value) or sys.intern(str(value))
+
+
+def _meta_type(value: Any) -> MetaType | str | None:
+    if value is None:
+        return None
+    return _META_TYPES.get(value) or sys.intern(str(value))
+
+
+class Block:
+    """One transcript block. Enum members compare equal to their JSON strings."""
+
+    __slots__ = (
+        "type",
+        "meta_type",
+        "timestamp",
+        "speaker",
+        "location",
+        "text",
+        "continuation_from_prev",
+    )
+
+    def __init__(
+        self,
+        type: BlockType | str | None = None,
+        meta_type: MetaType | str | None = None,
+        timestamp: str = "",
+        speaker: str = "",
+        location: str | None = None,
+        text: str = "",
+        continuation_from_prev: bool = False,
+    ) -> None:
+        self.type = type
+        self.meta_type = meta_type
+        self.timestamp = timestamp
+        self.speaker = speaker
+        self.location = location
+        self.text = text
+        self.continuation_from_prev = continuation_from_prev
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Block:
+        return cls(
+            type=_block_type(data.get("type")),
+            meta_type=_meta_type(data.get("meta_type")),
+            timestamp=data.get("timestamp") or "",
+            speaker=_intern(data.get("speaker")) or "",
+            location=_intern(data.get("location") or None),
+            text=data.get("text") or "",
+            continuation_from_prev=bool(data.get("continuation_from_prev", False)),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {}
+        if self.type is not None:
+            data["type"] = str(self.type)
+        if self.meta_type is not None:
+            data["meta_type"] = str(self.meta_type)
+        if self.timestamp:
+            data["timestamp"] = self.timestamp
+        if self.speaker:
+            data["speaker"] = self.speaker
+        if self.location:
+            data["location"] = self.location
+        if self.text:
+            data["text"] = self.text
+        if self.continuation_from_prev:
+            data["continuation_from_prev"] = True
+        return data
+
+
+class PageHeader:
+    __slots__ = ("page", "tape", "is_apollo_title", "page_type")
+
+    def __init__(
+        self,
+        page: int | None = None,
+        tape: str | None = None,
+        is_apollo_title: bool = False,
+        page_type: str | None = None,
+    ) -> None:
+        self.page = page
+        self.tape = tape
+        self.is_apollo_title = is_apollo_title
+        self.page_type = page_type
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PageHeader:
+        return cls(
+            page=data.get("page"),
+            tape=_intern(data.get("tape") or None),
+            is_apollo_title=bool(data.get("is_apollo_title", False)),
+            page_type=_intern(data.get("page_type")),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {"page": self.page}
+        if self.tape:
+            data["tape"] = self.tape
+        if self.is_apollo_title:
+            data["is_apollo_title"] = True
+        if self.page_type is not None:
+            data["page_type"] = self.page_type
+        return data
+
+
+class Page:
+    __slots__ = ("header", "blocks")
+
+    def __init__(self, header: PageHeader, blocks: tuple[Block, ...] = ()) -> None:
+        self.header = header
+        self.blocks = blocks
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Page:
+        return cls(
+            header=PageHeader.from_dict(data.get("header", {})),
+            blocks=tuple(Block.from_dict(block) for block in data.get("blocks", [])),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Canonical dict form (rendering-relevant fields only), used for hashing."""
+        return {
+            "header": self.header.to_dict(),
+            "blocks": [block.to_dict() for block in self.blocks],
+        }
@@ -0,0 +1,165 @@
+"""GET timestamp, tape and speaker index for selecting pages by transcript content."""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from model import BlockType, Page
+
+_GET_FIELDS = re.compile(r"\d+")
+# Seconds per field of a "DD HH MM SS" ground elapsed time, read from the right.
+_GET_UNITS = (1, 60, 3600, 86400)
+
+
+def parse_get(text: str) -> int:
+    """Seconds for a GET such as `00 00 53 11` or `00:53:11` (missing leading fields are 0)."""
+    fields = _GET_FIELDS.findall(text)
+    if not fields or len(fields) > len(_GET_UNITS) or _GET_FIELDS.sub("", text).strip(" :."):
+        raise ValueError(f"Invalid GET timestamp: {text!r}")
+    return sum(int(field) * unit for field, unit in zip(reversed(fields), _GET_UNITS, strict=False))
+
+
+def parse_get_range(text: str) -> tuple[int, int | None]:
+    """Parse `START-END`, `START-` (to the end) or a single `GET`.
+
+    A single GET selects the page that timestamp falls on; it is returned as
+    `(get, get)`.
+    """
+    start, sep, end = text.partition("-")
+    start_get = parse_get(start)
+    if not sep:
+        return start_get, start_get
+    end_get = parse_get(end) if end.strip() else None
+    if end_get is not None and end_get < start_get:
+        raise ValueError(f"GET range ends before it starts: {text!r}")
+    return start_get, end_get
+
+
+def tape_number(tape: str) -> str:
+    """`1/7` (tape 1, page 7 of the tape) -> `1`."""
+    return tape.partition("/")[0].strip()
+
+
+def build_search_index(pages: Iterable[Page]) -> dict[str, Any]:
+    """JSON-ready index: sorted `[get, page]` pairs, tape page ranges, speaker pages and the
+    last page number."""
+    gets: list[tuple[int, int]] = []
+    last_page = 0
+    tapes: dict[str, list[int]] = {}
+    speakers: dict[str, set[int]] = {}
+    for page in pages:
+        page_num = page.header.page
+        if page_num is None:
+            continue
+        last_page = max(last_page, page_num)
+        tape = page.header.tape
+        if tape:
+            # Both the tape number and the full label (`1` and `1/7`) map to page ranges.
+            for key in {tape_number(tape), tape}:
+                span = tapes.setdefault(key, [page_num, page_num])
+                span[0] = min(span[0], page_num)
+                span[1] = max(span[1], page_num)
+        for block in page.blocks:
+            if block.type != BlockType.COMM:
+                continue
+            try:
+                gets.append((parse_get(block.timestamp), page_num))
+            except ValueError:
+                pass
+            if block.speaker:
+                speakers.setdefault(block.speaker, set()).add(page_num)
+    gets.sort()
+    return {
+        "gets": [list(entry) for entry in gets],
+        "tapes": tapes,
+        "speakers": {speaker: sorted(nums) for speaker, nums in sorted(speakers.items())},
+        "last_page": last_page,
+    }
+
+
+class PageSearchIndex:
+    """Answers GET window, tape and speaker lookups from a `build_search_index` dict.
+
+    GET lookups bisect the sorted timestamps; tapes and speakers are plain
+    dictionary lookups.
+    """
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self._get_times = [entry[0] for entry in data["gets"]]
+        self._get_pages = [entry[1] for entry in data["gets"]]
+        self.tapes: dict[str, tuple[int, int]] = {
+            tape: (span[0], span[1]) for tape, span in data["tapes"].items()
+        }
+        self.speakers: dict[str, list[int]] = data["speakers"]
+        self.last_page: int = data["last_page"]
+
+    def pages_in_get_range(self, start: int, end: int | None) -> set[int]:
+        """Every page from the one the window opens on (last comm at or before `start`)
+        to the one holding its last comm, or to the last page for an open end.
+
+        Pages in between without comms (rest periods, annotations, notes) are
+        included. A window between two comms of one page selects that page, and
+        a single GET (`end == start`) the page that time falls on.
+        """
+        # Every comm at exactly `start`, else the last one before it.
+        lo = min(
+            bisect_left(self._get_times, start), max(bisect_right(self._get_times, start) - 1, 0)
+        )
+        hi = len(self._get_times) if end is None else bisect_right(self._get_times, end)
+        if hi <= lo:
+            return set()
+        first = self._get_pages[lo]
+        last = self.last_page if end is None else self._get_pages[hi - 1]
+        return set(range(first, last + 1))
+
+    def pages_on_tapes(self, tapes: Iterable[str]) -> set[int]:
+        pages: set[int] = set()
+        for tape in tapes:
+            span = self.tapes.get(tape)
+            if span is None:
+                raise ValueError(f"Unknown tape: {tape!r}")
+            pages.update(range(span[0], span[1] + 1))
+        return pages
+
+    def pages_with_speakers(self, speakers: Iterable[str]) -> set[int]:
+        pages: set[int] = set()
+        for speaker in speakers:
+            if speaker not in self.speakers:
+                raise ValueError(f"Unknown speaker: {speaker!r}")
+            pages.update(self.speakers[speaker])
+        return pages
+
+
+def filter_selection(
+    selected: Sequence[int],
+    search: PageSearchIndex,
+    get_range: str = "",
+    tapes: str = "",
+    speakers: str = "",
+) -> list[int]:
+    """Keep the pages of `selected` matching every given selector, in order.
+
+    `tapes` and `speakers` are comma-separated; a tape is either a tape number
+    (`1`, every page of the tape) or a page label (`1/7`).
+    """
+    matches: list[set[int]] = []
+    if get_range:
+        matches.append(search.pages_in_get_range(*parse_get_range(get_range)))
+    if tapes:
+        matches.append(search.pages_on_tapes(_csv(tapes)))
+    if speakers:
+        matches.append(search.pages_with_speakers(_csv(speakers)))
+    if not matches:
+        return list(selected)
+    wanted = set.intersection(*matches)
+    result = [page for page in selected if page in wanted]
+    if not result:
+        raise ValueError("No matching pages found for the given selection.")
+    return result
+
+
+def _csv(value: str) -> list[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
@@ -0,0 +1,234 @@
+"""Multi-process rendering of page selections: merged shards or pipelined layout."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from config import MissionStyle
+from constants import DEFAULT_SHARD_SIZE, PIPELINE_CHUNK_PAGES
+from fragment_cache import FragmentCache
+from io_utils import iter_pages
+from layout import PageLayout, layout_page
+from layout_cache import LayoutCache
+from model import Page
+from pdf_tools import merge_pdfs
+from profiling import Profiler, profile_stage
+from renderer import build_geometry, fragment_settings_digest, register_font, render_pdf
+
+# A worker's chunk result: pages with their layouts (None for cached fragments),
+# plus the layout cache hits and misses counted in that worker.
+_LayoutChunk = tuple[list[tuple[Page, PageLayout | None]], int, int]
+
+
+def shard_pages(selected_pages: list[int], shard_size: int) -> list[list[int]]:
+    size = max(1, shard_size)
+    return [selected_pages[i : i + size] for i in range(0, len(selected_pages), size)]
+
+
+def _render_shard(task: tuple[dict[str, Any], str]) -> str:
+    render_kwargs, shard_path = task
+    render_pdf(**render_kwargs, output_path=shard_path, invariant=True)
+    return shard_path
+
+
+def render_pdf_parallel(
+    *,
+    pages_by_num: Mapping[int, Page],
+    output_path: str,
+    selected_pages: list[int],
+    jobs: int,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    profiler: Profiler | None = None,
+    **render_kwargs: Any,
+) -> None:
+    # Shard boundaries depend only on the selection and shard size, never on `jobs`,
+    # so every worker count produces the same shard files and the same merged bytes.
+    shards = shard_pages(selected_pages, shard_size)
+    with tempfile.TemporaryDirectory(prefix="transcript-shards-") as tmp_dir:
+        tasks = []
+        for index, shard in enumerate(shards):
+            shard_kwargs = dict(render_kwargs)
+            shard_kwargs["pages_by_num"] = {page_num: pages_by_num[page_num] for page_num in shard}
+            shard_kwargs["selected_pages"] = shard
+            tasks.append((shard_kwargs, os.path.join(tmp_dir, f"shard_{index:05d}.pdf")))
+
+        workers = max(1, min(jobs, len(tasks)))
+        with profile_stage(profiler, "render_shards"):
+            if workers == 1:
+                part_paths = [_render_shard(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    part_paths = list(executor.map(_render_shard, tasks))
+
+        with profile_stage(profiler, "merge_shards"):
+            merge_pdfs(part_paths, output_path)
+
+
+def _layout_chunk(
+    task: tuple[
+        list[Page], int, int, MissionStyle, LayoutCache | None, FragmentCache | None, str
+    ],
+) -> _LayoutChunk:
+    pages, columns, space_len, mission_style, layout_cache, fragment_cache, settings = task
+    hits = misses = 0
+    if layout_cache is not None:
+        hits, misses = layout_cache.hits, layout_cache.misses
+    results: list[tuple[Page, PageLayout | None]] = []
+    for page in pages:
+        page_layout: PageLayout | None = None
+        if fragment_cache is not None and fragment_cache.contains(
+            fragment_cache.key(page, settings, mission_style)
+        ):
+            # `render_pdf` replays the cached fragment; no layout needed.
+            pass
+        elif layout_cache is not None:
+            page_layout = layout_cache.get_or_build(page, columns, space_len, mission_style)
+        else:
+            page_layout = layout_page(page, columns, space_len, mission_style)
+        results.append((page, page_layout))
+    if layout_cache is not None:
+        hits, misses = layout_cache.hits - hits, layout_cache.misses - misses
+    return results, hits, misses
+
+
+def _chunks(pages: Iterable[Page], size: int) -> Iterator[list[Page]]:
+    chunk: list[Page] = []
+    for page in pages:
+        chunk.append(page)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def pipelined_layouts(
+    pages: Iterable[Page],
+    *,
+    jobs: int,
+    columns: int,
+    space_len: int,
+    mission_style: MissionStyle,
+    layout_cache: LayoutCache | None = None,
+    fragment_cache: FragmentCache | None = None,
+    fragment_settings: str = "",
+    chunk_size: int = PIPELINE_CHUNK_PAGES,
+) -> Iterator[tuple[Page, PageLayout | None]]:
+    """Yield `pages` in order with their layouts, computed ahead by `jobs` worker processes.
+
+    Pages go to workers in chunks of `chunk_size`. At most `2 * jobs` chunks
+    are queued or waiting for the consumer, which bounds memory whatever the
+    selection size, and keeps every worker busy while the consumer draws.
+    Pages whose fragment (keyed by `fragment_settings`) is in `fragment_cache`
+    get no layout. Workers' layout cache hits and misses are added to
+    `layout_cache`'s counters.
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: deque[Future[_LayoutChunk]] = deque()
+
+        def collect() -> list[tuple[Page, PageLayout | None]]:
+            results, hits, misses = pending.popleft().result()
+            if layout_cache is not None:
+                layout_cache.hits += hits
+                layout_cache.misses += misses
+            return results
+
+        for chunk in _chunks(pages, chunk_size):
+            if len(pending) >= 2 * jobs:
+                yield from collect()
+            task = (
+                chunk,
+                columns,
+                space_len,
+                mission_style,
+                layout_cache,
+                fragment_cache,
+                fragment_settings,
+            )
+            pending.append(executor.submit(_layout_chunk, task))
+        while pending:
+            yield from collect()
+
+
+def render_pdf_pipelined(
+    *,
+    pages_by_num: Mapping[int, Page],
+    selected_pages: list[int],
+    jobs: int,
+    columns: int,
+    space_len: int,
+    mission_style: MissionStyle,
+    layout_cache: LayoutCache | None = None,
+    fragment_cache: FragmentCache | None = None,
+    **render_kwargs: Any,
+) -> dict[str, int] | None:
+    """`render_pdf` into one file, with page decoding and layout done by `jobs` workers.
+
+    The calling process only draws and writes, consuming pages in order, so
+    there is no shard merge. Pages already in the fragment cache are not laid
+    out. Takes and returns what `render_pdf` does.
+    """
+    page_layouts = None
+    if jobs > 1:
+        fragment_settings = ""
+        if fragment_cache is not None and not render_kwargs.get("compact"):
+            fragment_settings = _fragment_settings(
+                columns, space_len, mission_style, render_kwargs
+            )
+        page_layouts = pipelined_layouts(
+            iter_pages(pages_by_num, selected_pages),
+            jobs=jobs,
+            columns=columns,
+            space_len=space_len,
+            mission_style=mission_style,
+            layout_cache=layout_cache,
+            fragment_cache=fragment_cache if fragment_settings else None,
+            fragment_settings=fragment_settings,
+        )
+    return render_pdf(
+        pages_by_num=pages_by_num,
+        selected_pages=selected_pages,
+        columns=columns,
+        space_len=space_len,
+        mission_style=mission_style,
+        layout_cache=layout_cache,
+        fragment_cache=fragment_cache,
+        page_layouts=page_layouts,
+        **render_kwargs,
+    )
+
+
+def _fragment_settings(
+    columns: int, space_len: int, mission_style: MissionStyle, render_kwargs: Mapping[str, Any]
+) -> str:
+    """The fragment settings digest `render_pdf` will use for these arguments."""
+    font_path = render_kwargs["font_path"]
+    font_name = register_font(font_path)
+    geometry = build_geometry(
+        font_name=font_name,
+        font_size=render_kwargs["font_size"],
+        columns=columns,
+        left_margin_pt=render_kwargs["left_margin_pt"],
+        line_height_multiplier=render_kwargs["line_height_multiplier"],
+        fit_to_page=render_kwargs["fit_to_page"],
+        page_width_pt=render_kwargs["page_width_pt"],
+        page_height_pt=render_kwargs["page_height_pt"],
+        top_margin_pt=render_kwargs["top_margin_pt"],
+        bottom_margin_pt=render_kwargs["bottom_margin_pt"],
+        mission_style=mission_style,
+    )
+    return fragment_settings_digest(
+        geometry=geometry,
+        font_path=font_path,
+        font_name=font_name,
+        font_size=render_kwargs["font_size"],
+        faux_bold_pt=render_kwargs["faux_bold_pt"],
+        columns=columns,
+        space_len=space_len,
+        mission_style=mission_style,
+    )
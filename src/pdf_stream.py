@@ -0,0 +1,326 @@
+"""Streaming PDF writer: pages reach the output file as soon as they are drawn."""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from array import array
+from collections import Counter
+from typing import IO, TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen import canvas
+
+# Fixed object numbers; every other object is numbered in writing order.
+_CATALOG_OBJ = 1
+_PAGES_OBJ = 2
+_FONTS_OBJ = 3
+_FIRST_FREE_OBJ = 4
+
+# Compact mode packs this many page objects into each compressed object stream.
+_OBJECTS_PER_STREAM = 128
+
+
+def _fp(value: float) -> str:
+    from reportlab.lib.rl_accel import fp_str
+
+    result: str = fp_str(value)
+    return result
+
+
+def _pdf_string(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"({escaped})"
+
+
+class StreamingPdfWriter:
+    """Writes a PDF page by page instead of keeping the document until save.
+
+    Each `add_page` appends the page's content stream and page object to the
+    file. `close` then writes the objects that depend on the whole document
+    (fonts, page tree, catalog, info) followed by the cross-reference data
+    and trailer. Only one cross-reference entry and page number per object is
+    kept in memory.
+
+    Page operators come from `text_canvas`, a ReportLab canvas used only to encode
+    text: it owns the font names and TrueType subsets the pages refer to, and
+    is never saved.
+
+    `compact` writes PDF 1.5 for the smallest file: maximum compression, media
+    box and resources inherited from the page tree, page objects packed into
+    object streams, a compressed cross-reference stream, and Form XObjects
+    (`add_form`) for content repeated on many pages.
+    """
+
+    def __init__(
+        self,
+        output: str | IO[bytes],
+        text_canvas: canvas.Canvas,
+        page_width: float,
+        page_height: float,
+        *,
+        compress: bool = True,
+        compact: bool = False,
+        subject: str = "",
+    ) -> None:
+        self._owns_file = isinstance(output, str)
+        self.file: IO[bytes] = open(output, "wb") if isinstance(output, str) else output
+        self.text_canvas = text_canvas
+        self.compress = compress or compact
+        self.compact = compact
+        self.subject = subject
+        # Cross-reference entries: (1, offset, 0) for objects in the file body,
+        # (2, object stream, index) for objects packed into an object stream.
+        self.xref: list[tuple[int, int, int]] = [(1, 0, 0)] * (_FIRST_FREE_OBJ - 1)
+        self.page_objects = array("l")
+        self.forms: dict[str, int] = {}
+        # Characters drawn, when known: compact output embeds only these glyphs.
+        self.used_chars: set[str] = set()
+        # Bytes written per part of the file, and bytes saved by compression.
+        self.sizes: Counter[str] = Counter()
+        self._compressed_away = 0
+        self._packed: list[tuple[int, bytes]] = []
+        self._pos = 0
+        self._media_box = f"[0 0 {_fp(page_width)} {_fp(page_height)}]"
+        version = b"1.5" if compact else b"1.4"
+        self._write(b"%PDF-" + version + b"\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_objects)
+
+    def _write(self, data: bytes, part: str = "structure") -> None:
+        self.file.write(data)
+        self._pos += len(data)
+        self.sizes[part] += len(data)
+
+    def _new_object(self) -> int:
+        self.xref.append((1, 0, 0))
+        return len(self.xref)
+
+    def _write_object(self, number: int, body: str | bytes, part: str = "structure") -> None:
+        self.xref[number - 1] = (1, self._pos, 0)
+        if isinstance(body, str):
+            body = body.encode("latin-1")
+        self._write(b"%d 0 obj\n%s\nendobj\n" % (number, body), part)
+
+    def _write_stream(
+        self, number: int, data: bytes, extra: str = "", part: str = "structure"
+    ) -> None:
+        filters = ""
+        if self.compress:
+            raw_size = len(data)
+            data = zlib.compress(data, 9 if self.compact else zlib.Z_DEFAULT_COMPRESSION)
+            self._compressed_away += raw_size - len(data)
+            filters = " /Filter /FlateDecode"
+        header = f"<< /Length {len(data)}{filters}{extra} >>\nstream\n".encode("latin-1")
+        self._write_object(number, header + data + b"\nendstream", part)
+
+    def add_form(self, name: str, code: str, bbox: tuple[float, float, float, float]) -> None:
+        """Write a Form XObject drawn by `code`; pages paint it with `/<name> Do`.
+
+        Only compact output lists forms in the page resources.
+        """
+        number = self._new_object()
+        box = " ".join(_fp(value) for value in bbox)
+        self._write_stream(
+            number,
+            code.encode("latin-1"),
+            f" /Type /XObject /Subtype /Form /BBox [{box}]"
+            f" /Resources << /Font {_FONTS_OBJ} 0 R >>",
+            part="forms",
+        )
+        self.forms[name] = number
+
+    def add_page(self, code: str, line_width: float = 0) -> None:
+        contents = self._new_object()
+        page = self._new_object()
+        if line_width > 0:
+            code = f"{_fp(line_width)} w\n{code}"
+        self._write_stream(contents, code.encode("latin-1"), part="content")
+        self.page_objects.append(page)
+        if self.compact:
+            body = f"<< /Type /Page /Parent {_PAGES_OBJ} 0 R /Contents {contents} 0 R >>"
+            self._packed.append((page, body.encode("latin-1")))
+            if len(self._packed) >= _OBJECTS_PER_STREAM:
+                self._write_object_stream()
+            return
+        self._write_object(
+            page,
+            f"<< /Type /Page /Parent {_PAGES_OBJ} 0 R /MediaBox {self._media_box}"
+            f" /Resources << /Font {_FONTS_OBJ} 0 R /ProcSet [/PDF /Text] >>"
+            f" /Contents {contents} 0 R >>",
+        )
+
+    def _write_object_stream(self) -> None:
+        if not self._packed:
+            return
+        number = self._new_object()
+        index_entries = []
+        offset = 0
+        for index, (page, body) in enumerate(self._packed):
+            index_entries.append(f"{page} {offset}")
+            offset += len(body) + 1
+            self.xref[page - 1] = (2, number, index)
+        index_data = " ".join(index_entries).encode("latin-1") + b"\n"
+        self._write_stream(
+            number,
+            index_data + b"\n".join(body for _, body in self._packed),
+            f" /Type /ObjStm /N {len(self._packed)} /First {len(index_data)}",
+        )
+        self._packed.clear()
+
+    def _font_objects(self) -> dict[str, int]:
+        """Write every font the page operators used; return internal name -> object."""
+        from reportlab.pdfbase import pdfmetrics
+
+        doc = self.text_canvas._doc
+        fonts: dict[str, int] = {}
+        for font_name, internal_name in doc.fontMapping.items():
+            font = pdfmetrics.getFont(font_name)
+            if getattr(font, "_dynamicFont", False):
+                fonts.update(self._truetype_objects(font, doc))
+                continue
+            number = self._new_object()
+            self._write_object(
+                number,
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{font.face.name}"
+                f" /Encoding /{font.encoding.name} /Name {internal_name} >>",
+                part="fonts",
+            )
+            fonts[internal_name[1:]] = number
+        return fonts
+
+    def _truetype_objects(self, font: Any, doc: Any) -> dict[str, int]:
+        # Mirrors TTFont.addObjects / TTFontFace.addSubsetObjects for each used subset.
+        from reportlab.pdfbase.ttfonts import (
+            FF_NONSYMBOLIC,
+            FF_SYMBOLIC,
+            SUBSETN,
+            makeToUnicodeCMap,
+        )
+
+        state = font.state.get(doc)
+        if state is None or state.internalName is None:
+            return {}
+        face = font.face
+        flags = (face.flags & ~FF_NONSYMBOLIC) | FF_SYMBOLIC
+        bbox = " ".join(_fp(value) for value in face.bbox)
+        objects: dict[str, int] = {}
+        for index, subset in enumerate(state.subsets):
+            if index == 0 and self.compact and self.used_chars:
+                # The first subset reserves every printable ASCII code; map the
+                # unused ones to .notdef so their glyphs are not embedded.
+                used = {ord(char) for char in self.used_chars}
+                subset = [code if code in used or code > 127 else 0 for code in subset]
+            base_font = (SUBSETN(index) + b"+" + face.name + face.subfontNameX).decode("pdfdoc")
+            font_file = self._new_object()
+            subset_data = face.makeSubset(subset)
+            self._write_stream(
+                font_file, subset_data, f" /Length1 {len(subset_data)}", part="fonts"
+            )
+            descriptor = self._new_object()
+            self._write_object(
+                descriptor,
+                f"<< /Type /FontDescriptor /FontName /{base_font} /Flags {flags}"
+                f" /FontBBox [{bbox}] /ItalicAngle {_fp(face.italicAngle)}"
+                f" /Ascent {_fp(face.ascent)} /Descent {_fp(face.descent)}"
+                f" /CapHeight {_fp(face.capHeight)} /StemV {_fp(face.stemV)}"
+                f" /MissingWidth {_fp(face.defaultWidth)} /FontFile2 {font_file} 0 R >>",
+                part="fonts",
+            )
+            to_unicode = self._new_object()
+            cmap = makeToUnicodeCMap(base_font, subset).encode("latin-1")
+            self._write_stream(to_unicode, cmap, part="fonts")
+            widths = " ".join(_fp(face.getCharWidth(code)) for code in subset)
+            name = f"{state.internalName}+{index}"
+            number = self._new_object()
+            self._write_object(
+                number,
+                f"<< /Type /Font /Subtype /TrueType /Name /{name} /BaseFont /{base_font}"
+                f" /FirstChar 0 /LastChar {len(subset) - 1} /Widths [{widths}]"
+                f" /FontDescriptor {descriptor} 0 R /ToUnicode {to_unicode} 0 R >>",
+                part="fonts",
+            )
+            objects[name] = number
+        return objects
+
+    def _write_page_tree(self) -> None:
+        inherited = ""
+        if self.compact:
+            forms = " ".join(f"/{name} {number} 0 R" for name, number in self.forms.items())
+            inherited = (
+                f" /MediaBox {self._media_box} /Resources << /Font {_FONTS_OBJ} 0 R"
+                f" /XObject << {forms} >> /ProcSet [/PDF /Text] >>"
+            )
+        self.xref[_PAGES_OBJ - 1] = (1, self._pos, 0)
+        self._write(
+            f"{_PAGES_OBJ} 0 obj\n<< /Type /Pages /Count {self.page_count}{inherited} /Kids ["
+            .encode("latin-1")
+        )
+        for start in range(0, self.page_count, 1024):
+            kids = " ".join(f"{number} 0 R" for number in self.page_objects[start : start + 1024])
+            self._write(f"\n{kids}".encode("latin-1"))
+        self._write(b" ] >>\nendobj\n")
+
+    def _write_xref_table(self, info: int) -> None:
+        xref_pos = self._pos
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self.xref) + 1))
+        for start in range(0, len(self.xref), 1024):
+            entries = self.xref[start : start + 1024]
+            self._write(b"".join(b"%010d 00000 n \n" % offset for _, offset, _ in entries))
+        self._write(
+            b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(self.xref) + 1, _CATALOG_OBJ, info, xref_pos)
+        )
+
+    def _write_xref_stream(self, info: int) -> None:
+        number = self._new_object()
+        xref_pos = self._pos
+        self.xref[number - 1] = (1, xref_pos, 0)
+        entry = struct.Struct(">BIH")
+        data = entry.pack(0, 0, 0xFFFF) + b"".join(entry.pack(*fields) for fields in self.xref)
+        self._write_stream(
+            number,
+            data,
+            f" /Type /XRef /Size {len(self.xref) + 1} /W [1 4 2]"
+            f" /Root {_CATALOG_OBJ} 0 R /Info {info} 0 R",
+        )
+        self._write(b"startxref\n%d\n%%%%EOF\n" % xref_pos)
+
+    def close(self) -> dict[str, int]:
+        """Finish the file and return its size report.
+
+        Keys are the bytes written for `content`, `fonts`, `forms` and
+        `structure` (page tree, cross-reference data, ...), the file `total`,
+        and `uncompressed`, the size the same objects take without compression.
+        """
+        self._write_object_stream()
+        fonts = self._font_objects()
+        font_entries = " ".join(f"/{name} {number} 0 R" for name, number in fonts.items())
+        self._write_object(_FONTS_OBJ, f"<< {font_entries} >>", part="fonts")
+        self._write_page_tree()
+        self._write_object(_CATALOG_OBJ, f"<< /Type /Catalog /Pages {_PAGES_OBJ} 0 R >>")
+
+        info = self._new_object()
+        info_entries = "/Producer (nasa-transcript-printer streaming writer)"
+        if self.subject:
+            info_entries += f" /Subject {_pdf_string(self.subject)}"
+        self._write_object(info, f"<< {info_entries} >>")
+        if self.compact:
+            self._write_xref_stream(info)
+        else:
+            self._write_xref_table(info)
+
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+        return {
+            "content": self.sizes["content"],
+            "fonts": self.sizes["fonts"],
+            "forms": self.sizes["forms"],
+            "structure": self.sizes["structure"],
+            "total": self._pos,
+            "uncompressed": self._pos + self._compressed_away,
+        }
@@ -0,0 +1,84 @@
+"""PDF post-processing helpers (merge, page splicing) built on the optional pypdf dependency."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Sequence
+from typing import Any
+
+
+def _require_pypdf() -> Any:
+    try:
+        import pypdf
+    except ModuleNotFoundError as exc:  # pragma: no cover - depends on environment
+        raise RuntimeError(
+            "pypdf is required for this mode; install it with `pip install -e .[pdf]`."
+        ) from exc
+    return pypdf
+
+
+def merge_pdfs(part_paths: Sequence[str], output_path: str) -> None:
+    pypdf = _require_pypdf()
+    writer = pypdf.PdfWriter()
+    metadata = None
+    for part_path in part_paths:
+        reader = pypdf.PdfReader(part_path)
+        if metadata is None and reader.metadata:
+            metadata = dict(reader.metadata)
+        for page in reader.pages:
+            writer.add_page(page)
+    if metadata:
+        writer.add_metadata(metadata)
+    with open(output_path, "wb") as file:
+        writer.write(file)
+
+
+def assemble_pages(picks: Sequence[tuple[str, int]], output_path: str) -> None:
+    """Write a PDF made of `(source_path, page_index)` picks, in order.
+
+    Sources may include `output_path` itself: the result is written to a
+    temporary file and moved into place once every source page is copied.
+    """
+    pypdf = _require_pypdf()
+    writer = pypdf.PdfWriter()
+    readers: dict[str, Any] = {}
+    metadata = None
+    for source_path, page_index in picks:
+        reader = readers.get(source_path)
+        if reader is None:
+            reader = pypdf.PdfReader(source_path)
+            readers[source_path] = reader
+            if metadata is None and reader.metadata:
+                metadata = dict(reader.metadata)
+        writer.add_page(reader.pages[page_index])
+    if metadata:
+        writer.add_metadata(metadata)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        writer.write(file)
+    os.replace(tmp_path, output_path)
+
+
+def add_outline(pdf_path: str, outline: Sequence[tuple[str, Sequence[tuple[int, str]]]]) -> None:
+    """Replace the outline of `pdf_path` with a two-level bookmark tree.
+
+    Each entry is a title and its `(page_index, title)` children; the entry
+    itself points at its first child's page. The PDF opens with the outline shown.
+    """
+    pypdf = _require_pypdf()
+    reader = pypdf.PdfReader(pdf_path)
+    writer = pypdf.PdfWriter()
+    writer.append(reader, import_outline=False)
+    if reader.metadata:
+        writer.add_metadata(dict(reader.metadata))
+    for title, children in outline:
+        if not children:
+            continue
+        parent = writer.add_outline_item(title, children[0][0])
+        for page_index, child_title in children:
+            writer.add_outline_item(child_title, page_index, parent=parent)
+    writer.page_mode = "/UseOutlines"
+    tmp_path = f"{pdf_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        writer.write(file)
+    os.replace(tmp_path, pdf_path)
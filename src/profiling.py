@@ -0,0 +1,120 @@
+"""Stage-level timing and memory profiling for the CLI pipeline."""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from typing import Any
+
+try:
+    import resource
+except ModuleNotFoundError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+
+def _peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux.
+    return int(peak // 1024) if sys.platform == "darwin" else int(peak)
+
+
+class Profiler:
+    """Collects wall/CPU time and peak memory per stage, and per-page timings.
+
+    Peak RSS is the process high-water mark at the end of each stage. With
+    `trace_memory`, tracemalloc also records the Python heap peak inside each
+    stage (at a noticeable runtime cost).
+    """
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.stages: list[dict[str, Any]] = []
+        self.pages: list[dict[str, Any]] = []
+        self.counters: dict[str, int] = {}
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            entry: dict[str, Any] = {
+                "stage": name,
+                "wall_s": time.perf_counter() - wall_start,
+                "cpu_s": time.process_time() - cpu_start,
+                "peak_rss_kb": _peak_rss_kb(),
+            }
+            if self.trace_memory:
+                entry["peak_heap_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+            self.stages.append(entry)
+
+    def record_page(
+        self, page_num: int, kind: str, decode_s: float, layout_s: float, draw_s: float
+    ) -> None:
+        self.pages.append(
+            {
+                "page": page_num,
+                "kind": kind,
+                "decode_s": decode_s,
+                "layout_s": layout_s,
+                "draw_s": draw_s,
+            }
+        )
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def page_summary(self) -> dict[str, dict[str, Any]]:
+        summary: dict[str, dict[str, Any]] = {}
+        for entry in self.pages:
+            kind = summary.setdefault(
+                entry["kind"],
+                {
+                    "pages": 0,
+                    "decode_s": 0.0,
+                    "layout_s": 0.0,
+                    "draw_s": 0.0,
+                    "max_decode_s": 0.0,
+                    "max_layout_s": 0.0,
+                    "max_draw_s": 0.0,
+                },
+            )
+            kind["pages"] += 1
+            kind["decode_s"] += entry["decode_s"]
+            kind["layout_s"] += entry["layout_s"]
+            kind["draw_s"] += entry["draw_s"]
+            kind["max_decode_s"] = max(kind["max_decode_s"], entry["decode_s"])
+            kind["max_layout_s"] = max(kind["max_layout_s"], entry["layout_s"])
+            kind["max_draw_s"] = max(kind["max_draw_s"], entry["draw_s"])
+        return summary
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "stages": self.stages,
+            "pages_by_kind": self.page_summary(),
+            "pages": self.pages,
+            "counters": self.counters,
+        }
+
+    def write(self, path: str) -> None:
+        payload = json.dumps(self.report(), indent=2)
+        if path == "-":
+            print(payload)
+            return
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(payload + "\n")
+
+
+def profile_stage(profiler: Profiler | None, name: str) -> AbstractContextManager[None]:
+    return profiler.stage(name) if profiler is not None else nullcontext()
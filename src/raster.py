@@ -0,0 +1,232 @@
+"""PNG/TIFF page export built on the optional Pillow dependency."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import reportlab
+
+from config import MissionStyle
+from constants import BILEVEL_MIN_DPI
+from layout import layout_page
+from layout_cache import LayoutCache
+from model import Page
+from profiling import Profiler, profile_stage
+from renderer import build_geometry, place_lines, register_font
+
+_EXTENSIONS = {"png": "png", "tiff": "tif"}
+
+# Built-in Courier outlines shipped with ReportLab, used when no TTF font is configured.
+_BUILTIN_COURIER = str(Path(reportlab.__file__).parent / "fonts" / "com_____.pfb")
+
+
+def _require_pillow() -> Any:
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ModuleNotFoundError as exc:  # pragma: no cover - depends on environment
+        raise RuntimeError(
+            "Pillow is required for PNG/TIFF export; install it with `pip install -e .[raster]`."
+        ) from exc
+    return Image, ImageDraw, ImageFont
+
+
+class _GlyphAtlas:
+    """Pre-rendered glyph masks for one font, pixel size, stroke and image mode.
+
+    Pillow rasterizes the whole string on every `draw.text` call. Transcript
+    pages reuse a small character set in a monospaced font, so each glyph is
+    rendered once and pasted at its cell position instead.
+    """
+
+    def __init__(self, font_path: str, size_px: float, stroke_px: int, mode: str) -> None:
+        _, _, image_font = _require_pillow()
+        self.font = image_font.truetype(font_path, size_px)
+        self.advance = self.font.getlength("M")
+        self.stroke_px = stroke_px
+        self.mode = mode
+        self.glyphs: dict[str, tuple[Any, int, int] | None] = {}
+
+    def glyph(self, char: str) -> tuple[Any, int, int] | None:
+        """Return `(mask, dx, dy)` relative to the baseline origin, or None for blank glyphs."""
+        if char in self.glyphs:
+            return self.glyphs[char]
+        image_module, image_draw, _ = _require_pillow()
+        left, top, right, bottom = self.font.getbbox(
+            char, anchor="ls", stroke_width=self.stroke_px
+        )
+        entry = None
+        if right > left and bottom > top:
+            mask = image_module.new(self.mode, (right - left, bottom - top), 0)
+            image_draw.Draw(mask).text(
+                (-left, -top),
+                char,
+                font=self.font,
+                fill=255 if self.mode == "L" else 1,
+                anchor="ls",
+                stroke_width=self.stroke_px,
+                stroke_fill=255 if self.mode == "L" else 1,
+            )
+            entry = (mask, left, top)
+        self.glyphs[char] = entry
+        return entry
+
+
+@lru_cache(maxsize=8)
+def _glyph_atlas(font_path: str, size_px: float, stroke_px: int, mode: str) -> _GlyphAtlas:
+    return _GlyphAtlas(font_path, size_px, stroke_px, mode)
+
+
+@dataclass(frozen=True)
+class RasterTask:
+    """One page to rasterize, as sent to a worker: positioned lines and output files."""
+
+    placements: list[tuple[float, float, str]]
+    page_width: float
+    page_height: float
+    dpi: int
+    font_path: str
+    font_size: float
+    stroke_px: int
+    outputs: list[tuple[str, str]]
+
+
+def raster_output_dir(output_path: str, fmt: str, dpi: int) -> Path:
+    """Directory for one format and resolution: `output/run.pdf` -> `output/run_png_300dpi/`."""
+    path = Path(output_path)
+    return path.with_name(f"{path.stem}_{fmt}_{dpi}dpi")
+
+
+def rasterize_page(task: RasterTask) -> list[str]:
+    image_module, _, _ = _require_pillow()
+    scale = task.dpi / 72
+    # Print resolutions are written bilevel: 1 bit per pixel keeps a 1200-DPI page near 16 MB.
+    mode = "1" if task.dpi >= BILEVEL_MIN_DPI else "L"
+    size = (round(task.page_width * scale), round(task.page_height * scale))
+    image = image_module.new(mode, size, 1 if mode == "1" else 255)
+    atlas = _glyph_atlas(task.font_path, task.font_size * scale, task.stroke_px, mode)
+    for x, y, text in task.placements:
+        origin_x = x * scale
+        baseline = round((task.page_height - y) * scale)
+        for index, char in enumerate(text):
+            glyph = atlas.glyph(char)
+            if glyph is not None:
+                mask, dx, dy = glyph
+                image.paste(0, (round(origin_x + index * atlas.advance) + dx, baseline + dy), mask)
+
+    written = []
+    for fmt, path in task.outputs:
+        if fmt == "tiff":
+            compression = "group4" if mode == "1" else "tiff_lzw"
+            image.save(path, format="TIFF", dpi=(task.dpi, task.dpi), compression=compression)
+        else:
+            image.save(path, format="PNG", dpi=(task.dpi, task.dpi))
+        written.append(path)
+    return written
+
+
+def _run_bounded(tasks: Iterator[RasterTask], jobs: int) -> int:
+    """Rasterize `tasks` on `jobs` processes with at most `2 * jobs` pages submitted at once."""
+    count = 0
+    if jobs == 1:
+        for task in tasks:
+            rasterize_page(task)
+            count += 1
+        return count
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: set[Future[list[str]]] = set()
+        for task in tasks:
+            if len(pending) >= 2 * jobs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                    count += 1
+            pending.add(executor.submit(rasterize_page, task))
+        for future in pending:
+            future.result()
+            count += 1
+    return count
+
+
+def render_raster(
+    *,
+    pages_by_num: Mapping[int, Page],
+    output_path: str,
+    selected_pages: list[int],
+    formats: list[str],
+    raster_dpi: int,
+    jobs: int,
+    columns: int,
+    space_len: int,
+    font_path: str,
+    font_size: float,
+    left_margin_pt: float | None,
+    line_height_multiplier: float,
+    fit_to_page: bool,
+    page_width_pt: float,
+    page_height_pt: float,
+    top_margin_pt: float,
+    bottom_margin_pt: float,
+    faux_bold_pt: float,
+    mission_style: MissionStyle,
+    layout_cache: LayoutCache | None = None,
+    profiler: Profiler | None = None,
+    **_pdf_options: Any,
+) -> list[Path]:
+    """Write one image per selected page and format, with the same placement as the PDF.
+
+    Layout runs in this process; workers only draw and encode, one page image
+    each, so memory stays bounded by the worker count. Other `render_pdf`
+    arguments (including the reference `dpi`) are accepted and ignored.
+    Returns the output directories.
+    """
+    _require_pillow()
+    geometry = build_geometry(
+        font_name=register_font(font_path),
+        font_size=font_size,
+        columns=columns,
+        left_margin_pt=left_margin_pt,
+        line_height_multiplier=line_height_multiplier,
+        fit_to_page=fit_to_page,
+        page_width_pt=page_width_pt,
+        page_height_pt=page_height_pt,
+        top_margin_pt=top_margin_pt,
+        bottom_margin_pt=bottom_margin_pt,
+        mission_style=mission_style,
+    )
+    out_dirs = {fmt: raster_output_dir(output_path, fmt, raster_dpi) for fmt in formats}
+    for out_dir in out_dirs.values():
+        out_dir.mkdir(parents=True, exist_ok=True)
+    # PDF strokes are centered on the glyph outline; Pillow strokes outward only.
+    stroke_px = round(faux_bold_pt * raster_dpi / 72 / 2)
+
+    def tasks() -> Iterator[RasterTask]:
+        for page_num in selected_pages:
+            page = pages_by_num[page_num]
+            if layout_cache is not None:
+                page_layout = layout_cache.get_or_build(page, columns, space_len, mission_style)
+            else:
+                page_layout = layout_page(page, columns, space_len, mission_style)
+            yield RasterTask(
+                placements=place_lines(page_layout, geometry),
+                page_width=geometry.page_width,
+                page_height=geometry.page_height,
+                dpi=raster_dpi,
+                font_path=font_path or _BUILTIN_COURIER,
+                font_size=font_size,
+                stroke_px=stroke_px,
+                outputs=[
+                    (fmt, str(out_dir / f"page_{page_num:04d}.{_EXTENSIONS[fmt]}"))
+                    for fmt, out_dir in out_dirs.items()
+                ],
+            )
+
+    workers = max(1, min(jobs, len(selected_pages)))
+    with profile_stage(profiler, "rasterize"):
+        _run_bounded(tasks(), workers)
+    return list(out_dirs.values())
@@ -2,99 +2,38 @@
 
 from __future__ import annotations
 
-from reportlab.lib.pagesizes import portrait
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
-
-from layout import align_center, build_page_lines, wrap_text
-
-
-def is_note_page(page: dict, mission_style: dict) -> bool:
-    page_num = page.get("header", {}).get("page")
-    note_pages = {int(p) for p in mission_style.get("note_pages", [])}
-    return page_num in note_pages
-
-
-def is_centered_rest_period_page(page: dict, mission_style: dict) -> bool:
-    header = page.get("header", {})
-    if header.get("page_type") != "rest_period":
-        return False
-    if not bool(mission_style.get("center_rest_period_text", True)):
-        return False
-    blocks = page.get("blocks", [])
-    if not bool(mission_style.get("rest_period_only_when_no_comm", True)):
-        return True
-    return all(block.get("type") != "comm" for block in blocks)
-
-
-def build_rest_period_lines(page: dict, columns: int, space_len: int) -> list[str]:
-    blocks = page.get("blocks", [])
-    texts: list[str] = []
-    for block in blocks:
-        if block.get("meta_type") == "rest_period":
-            text = block.get("text", "").strip()
-            if text:
-                texts.append(text)
-    if not texts:
-        for block in blocks:
-            text = block.get("text", "").strip()
-            if text:
-                texts.append(text)
-
-    lines: list[str] = []
-    for text in texts:
-        wrapped = wrap_text(text, columns, space_len=space_len)
-        lines.extend(wrapped)
-    return lines
-
-
-def build_rest_period_header_lines(page: dict, columns: int, mission_style: dict) -> list[str]:
-    lines: list[str] = []
-    header = page.get("header", {})
-    tape = header.get("tape")
-    page_num = header.get("page")
-    is_title = header.get("is_apollo_title")
-    title_line = str(mission_style.get("title_line", "AIR-TO-GROUND VOICE TRANSCRIPTION"))
-    goss_line_text = str(mission_style.get("goss_line", "(GOSS NET 1)"))
-
-    if is_title:
-        lines.extend([align_center(title_line, columns), "", ""])
-    if tape:
-        tape_str = f"Tape {tape}"
-        if len(goss_line_text) + len(tape_str) + 1 <= columns:
-            goss_line = (
-                goss_line_text
-                + " " * (columns - len(goss_line_text) - len(tape_str))
-                + tape_str
-            )
-        else:
-            goss_line = goss_line_text
-        lines.append(goss_line)
-        lines.append(f"Page {page_num}".rjust(columns))
-        lines.extend(["", ""])
-    return lines
-
-
-def build_note_lines(page: dict, columns: int, space_len: int, mission_style: dict) -> list[str]:
-    heading = str(mission_style.get("note_heading", "NOTE")).strip()
-    lines: list[str] = [align_center(heading, columns), ""]
-    block_columns = int(mission_style.get("note_block_columns", columns))
-    block_columns = max(1, min(columns, block_columns))
-    blocks = page.get("blocks", [])
-    body_texts = []
-    for block in blocks:
-        text = (block.get("text") or "").strip()
-        if text:
-            body_texts.append(text)
-    for text in body_texts:
-        wrapped = wrap_text(text, block_columns, space_len=space_len)
-        lines.extend(align_center(line, columns) for line in wrapped)
-    return lines
+import io
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from typing import IO, TYPE_CHECKING
+
+from config import MissionStyle
+from exporters import PageSink
+from fingerprint import font_hash
+from font_cache import FontCache
+from fragment_cache import FragmentCache
+from io_utils import iter_pages
+from layout import (
+    LAYOUT_STYLE_KEYS,
+    PAGE_KIND_NORMAL,
+    PAGE_KIND_NOTE,
+    PageLayout,
+    layout_page,
+)
+from layout_cache import LayoutCache
+from model import Page
+from pdf_stream import StreamingPdfWriter
+from profiling import Profiler, profile_stage
+
+# ReportLab is imported where it is used: argument errors, page selection and
+# text-only exports never pay for it.
+if TYPE_CHECKING:
+    from reportlab.pdfgen import canvas
 
 
 def resolve_page_selection(
-    pages_by_num: dict[int, dict],
+    pages_by_num: Mapping[int, Page],
     pages: list[int],
     page_start: int,
     page_end: int | None,
@@ -122,15 +61,199 @@ def resolve_page_selection(
     return existing
 
 
-def render_pdf(
+@dataclass(frozen=True)
+class PageGeometry:
+    """Page size, margins and font metrics shared by every page of a render."""
+
+    page_width: float
+    page_height: float
+    left_margin: float
+    top_margin: float
+    bottom_margin: float
+    line_height: float
+    char_width: float
+    fit_to_page: bool
+    note_center_vertical: bool
+    note_top_blank_lines: int
+
+
+def line_budget(geometry: PageGeometry) -> int:
+    """Lines of the nominal line height that fit between the top and bottom margins."""
+    usable_height = geometry.page_height - geometry.top_margin - geometry.bottom_margin
+    return int(usable_height / geometry.line_height)
+
+
+def fit_lines(line_count: int, geometry: PageGeometry) -> tuple[float, int]:
+    """Line height and number of lines drawn for a normal page of `line_count` lines.
+
+    Lines past the budget are dropped, unless `fit_to_page` squeezes the line
+    height so that all of them fit.
+    """
+    max_lines = line_budget(geometry)
+    if geometry.fit_to_page and line_count > max_lines and line_count > 1:
+        usable_height = geometry.page_height - geometry.top_margin - geometry.bottom_margin
+        return usable_height / (line_count - 1), line_count
+    return geometry.line_height, min(line_count, max_lines)
+
+
+def place_lines(page_layout: PageLayout, geometry: PageGeometry) -> list[tuple[float, float, str]]:
+    """Return `(x, y, text)` baseline positions for every non-empty line of a page."""
+    placements: list[tuple[float, float, str]] = []
+    line_height = geometry.line_height
+    top_y = geometry.page_height - geometry.top_margin
+
+    if page_layout.kind == PAGE_KIND_NORMAL:
+        line_height, line_count = fit_lines(len(page_layout.lines), geometry)
+        lines = page_layout.lines[:line_count]
+
+        y = top_y
+        for line in lines:
+            if line:
+                placements.append((geometry.left_margin, y, line))
+            y -= line_height
+        return placements
+
+    y_header = top_y
+    for line in page_layout.header_lines:
+        if line:
+            placements.append((geometry.left_margin, y_header, line))
+        y_header -= line_height
+
+    body_lines = page_layout.lines
+    if body_lines:
+        if page_layout.kind == PAGE_KIND_NOTE and not geometry.note_center_vertical:
+            y = y_header - (geometry.note_top_blank_lines * line_height)
+        else:
+            content_height = (len(body_lines) - 1) * line_height
+            y = (geometry.page_height + content_height) / 2
+        for line in body_lines:
+            if line:
+                # Monospaced font: the line width is its length in character cells.
+                x = max(0.0, (geometry.page_width - len(line) * geometry.char_width) / 2)
+                placements.append((x, y, line))
+            y -= line_height
+    return placements
+
+
+def page_text_code(
+    pdf: canvas.Canvas,
+    placements: list[tuple[float, float, str]],
+    font_name: str,
+    font_size: float,
+    faux_bold_pt: float,
+) -> str:
+    """Return the operators of one text object drawing `placements` with relative moves.
+
+    Faux bold uses the fill-then-stroke text render mode (with the line width
+    set by `draw_page_code`) instead of drawing every line twice.
+    """
+    text = pdf.beginText()
+    text.setFont(font_name, font_size)
+    if faux_bold_pt > 0:
+        text.setTextRenderMode(2)
+    cursor_x = cursor_y = 0.0
+    for x, y, line in placements:
+        text.moveCursor(x - cursor_x, cursor_y - y)
+        text.textOut(line)
+        cursor_x, cursor_y = x, y
+    code: str = text.getCode()
+    return code
+
+
+def draw_page_code(pdf: canvas.Canvas, code: str, faux_bold_pt: float) -> None:
+    if faux_bold_pt > 0:
+        pdf.setLineWidth(faux_bold_pt)
+    pdf.addLiteral(code)
+
+
+def is_portable_code(font_path: str, placements: list[tuple[float, float, str]]) -> bool:
+    """True when a page's operators can be replayed into any document.
+
+    Built-in fonts encode text the same way everywhere. Embedded TTF subsets
+    only keep printable ASCII at fixed codes; other characters get codes in
+    order of first use within a document.
+    """
+    return not font_path or all(text.isascii() and text.isprintable() for _, _, text in placements)
+
+
+def compact_placements(
+    placements: list[tuple[float, float, str]], char_width: float
+) -> list[tuple[float, float, str]]:
+    """Move leading spaces into the x position and drop trailing ones (monospaced font)."""
+    compacted = []
+    for x, y, line in placements:
+        text = line.lstrip(" ")
+        compacted.append((x + (len(line) - len(text)) * char_width, y, text.rstrip(" ")))
+    return compacted
+
+
+def compact_page_code(
+    pdf: canvas.Canvas,
+    writer: StreamingPdfWriter,
+    placements: list[tuple[float, float, str]],
+    shared_lines: Sequence[str],
+    geometry: PageGeometry,
+    font_name: str,
+    font_size: float,
+    faux_bold_pt: float,
+) -> str:
+    """Page operators for compact output.
+
+    Lines starting with one of `shared_lines` (the mission title and GOSS net
+    headings) paint it from a Form XObject written once per document.
+    """
+    from reportlab.lib.rl_accel import fp_str
+
+    placements = compact_placements(placements, geometry.char_width)
+    text_placements = []
+    form_ops = []
+    for x, y, text in placements:
+        writer.used_chars.update(text)
+        shared = next((line for line in shared_lines if line and text.startswith(line)), None)
+        if shared is None:
+            text_placements.append((x, y, text))
+            continue
+        form_name = f"H{shared_lines.index(shared) + 1}"
+        if form_name not in writer.forms:
+            code = page_text_code(pdf, [(0.0, 0.0, shared)], font_name, font_size, faux_bold_pt)
+            width = len(shared) * geometry.char_width
+            bbox = (-font_size, -font_size, width + font_size, 2 * font_size)
+            writer.add_form(form_name, code, bbox)
+        form_ops.append(f"q 1 0 0 1 {fp_str(x, y)} cm /{form_name} Do Q")
+        rest = text[len(shared) :]
+        if rest.strip(" "):
+            rest_x = x + len(shared) * geometry.char_width
+            text_placements += compact_placements([(rest_x, y, rest)], geometry.char_width)
+    code = page_text_code(pdf, text_placements, font_name, font_size, faux_bold_pt)
+    return "\n".join([code, *form_ops])
+
+
+_REGISTERED_FONTS: dict[str, str] = {}
+_FONT_CACHE = FontCache()
+
+
+def register_font(font_path: str) -> str:
+    """Register a TTF font once per process and return its ReportLab font name.
+
+    The parsed font comes from the on-disk font cache when it is current.
+    """
+    if not font_path:
+        return "Courier"
+    font_name = _REGISTERED_FONTS.get(font_path)
+    if font_name is None:
+        from reportlab.pdfbase import pdfmetrics
+
+        font_name = "CustomFont" + (str(len(_REGISTERED_FONTS) + 1) if _REGISTERED_FONTS else "")
+        pdfmetrics.registerFont(_FONT_CACHE.load_ttfont(font_name, font_path))
+        _REGISTERED_FONTS[font_path] = font_name
+    return font_name
+
+
+def build_geometry(
     *,
-    pages_by_num: dict[int, dict],
-    output_path: str,
-    selected_pages: list[int],
-    columns: int,
-    space_len: int,
-    font_path: str,
+    font_name: str,
     font_size: float,
+    columns: int,
     left_margin_pt: float | None,
     line_height_multiplier: float,
     fit_to_page: bool,
@@ -138,102 +261,248 @@ def render_pdf(
     page_height_pt: float,
     top_margin_pt: float,
     bottom_margin_pt: float,
-    dpi: int,
-    faux_bold_pt: float,
-    mission_style: dict,
-) -> None:
-    if font_path:
-        pdfmetrics.registerFont(TTFont("CustomFont", font_path))
-        font_name = "CustomFont"
-    else:
-        font_name = "Courier"
+    mission_style: MissionStyle,
+    char_width: float | None = None,
+) -> PageGeometry:
+    """Page geometry for a render; `char_width` skips the font metrics lookup when given."""
+    # Portrait orientation, as `reportlab.lib.pagesizes.portrait`.
+    page_width, page_height = sorted((page_width_pt, page_height_pt))
 
-    page_width, page_height = portrait((page_width_pt, page_height_pt))
+    if char_width is None:
+        from reportlab.pdfbase import pdfmetrics
 
-    char_width = pdfmetrics.stringWidth("M", font_name, font_size)
+        char_width = pdfmetrics.stringWidth("M", font_name, font_size)
     text_width = char_width * columns
     if left_margin_pt is None:
         left_margin = max(0.0, (page_width - text_width) / 2)
     else:
         left_margin = max(0.0, left_margin_pt)
 
-    base_line_height = font_size * line_height_multiplier
-    top_y = page_height - top_margin_pt
-
-    pdf = canvas.Canvas(output_path, pagesize=(page_width, page_height))
-    pdf.setSubject(f"Rendered with reference DPI {dpi}")
-    pdf.setFont(font_name, font_size)
-
-    for page_num in selected_pages:
-        page = pages_by_num[page_num]
-        note_page = is_note_page(page, mission_style)
-        centered_rest_page = is_centered_rest_period_page(page, mission_style)
-        line_height = base_line_height
-
-        if note_page:
-            header_lines = build_rest_period_header_lines(page, columns, mission_style)
-            note_lines = build_note_lines(page, columns, space_len, mission_style)
-
-            y_header = top_y
-            for line in header_lines:
-                pdf.drawString(left_margin, y_header, line)
-                if faux_bold_pt > 0:
-                    pdf.drawString(left_margin + faux_bold_pt, y_header, line)
-                y_header -= line_height
-
-            if note_lines:
-                if bool(mission_style.get("note_center_vertical", False)):
-                    content_height = (len(note_lines) - 1) * line_height
-                    y = (page_height + content_height) / 2
+    return PageGeometry(
+        page_width=page_width,
+        page_height=page_height,
+        left_margin=left_margin,
+        top_margin=top_margin_pt,
+        bottom_margin=bottom_margin_pt,
+        line_height=font_size * line_height_multiplier,
+        char_width=char_width,
+        fit_to_page=fit_to_page,
+        note_center_vertical=mission_style.note_center_vertical,
+        note_top_blank_lines=mission_style.note_top_blank_lines,
+    )
+
+
+def fragment_settings_digest(
+    *,
+    geometry: PageGeometry,
+    font_path: str,
+    font_name: str,
+    font_size: float,
+    faux_bold_pt: float,
+    columns: int,
+    space_len: int,
+    mission_style: MissionStyle,
+) -> str:
+    """Digest of the render settings that fragment cache keys depend on."""
+    return FragmentCache.settings_digest(
+        {
+            "geometry": asdict(geometry),
+            "font": font_hash(font_path),
+            "font_name": font_name,
+            "font_size": font_size,
+            "faux_bold_pt": faux_bold_pt,
+            "columns": columns,
+            "space_len": space_len,
+            "style": {key: getattr(mission_style, key) for key in LAYOUT_STYLE_KEYS},
+        }
+    )
+
+
+def render_pdf(
+    *,
+    pages_by_num: Mapping[int, Page],
+    output_path: str | IO[bytes],
+    selected_pages: list[int],
+    columns: int,
+    space_len: int,
+    font_path: str,
+    font_size: float,
+    left_margin_pt: float | None,
+    line_height_multiplier: float,
+    fit_to_page: bool,
+    page_width_pt: float,
+    page_height_pt: float,
+    top_margin_pt: float,
+    bottom_margin_pt: float,
+    dpi: int,
+    faux_bold_pt: float,
+    mission_style: MissionStyle,
+    invariant: bool = False,
+    layout_cache: LayoutCache | None = None,
+    fragment_cache: FragmentCache | None = None,
+    profiler: Profiler | None = None,
+    page_sinks: Sequence[PageSink] = (),
+    streaming: bool = False,
+    compact: bool = False,
+    page_layouts: Iterator[tuple[Page, PageLayout | None]] | None = None,
+) -> dict[str, int] | None:
+    """Render `selected_pages` to a PDF.
+
+    With `streaming`, pages go to a `StreamingPdfWriter` as they are drawn and
+    are decoded one at a time, so memory does not grow with the page count.
+    `compact` streams the smallest file the writer can produce: shared header
+    forms, no padding spaces and, for TTF fonts, only the glyphs used.
+    `page_layouts` supplies `selected_pages`, in order, as already decoded pages
+    with layouts computed elsewhere (see `parallel.pipelined_layouts`); a `None`
+    layout is computed here if the page is not replayed from the fragment cache.
+    Returns the writer's size report when streaming.
+    """
+    if compact:
+        streaming = True
+        # Compact pages refer to per-document forms and subset codes.
+        fragment_cache = None
+    with profile_stage(profiler, "font_registration"):
+        font_name = register_font(font_path)
+
+    geometry = build_geometry(
+        font_name=font_name,
+        font_size=font_size,
+        columns=columns,
+        left_margin_pt=left_margin_pt,
+        line_height_multiplier=line_height_multiplier,
+        fit_to_page=fit_to_page,
+        page_width_pt=page_width_pt,
+        page_height_pt=page_height_pt,
+        top_margin_pt=top_margin_pt,
+        bottom_margin_pt=bottom_margin_pt,
+        mission_style=mission_style,
+    )
+
+    from reportlab.pdfgen import canvas
+
+    subject = f"Rendered with reference DPI {dpi}"
+    writer = None
+    pages: Iterable[Page]
+    if streaming:
+        # The canvas only encodes text and tracks font subsets; it is never saved.
+        pdf = canvas.Canvas(io.BytesIO(), pagesize=(geometry.page_width, geometry.page_height))
+        writer = StreamingPdfWriter(
+            output_path,
+            pdf,
+            geometry.page_width,
+            geometry.page_height,
+            compact=compact,
+            subject=subject,
+        )
+        pages = iter_pages(pages_by_num, selected_pages)
+    else:
+        pdf = canvas.Canvas(
+            output_path, pagesize=(geometry.page_width, geometry.page_height), invariant=invariant
+        )
+        pdf.setSubject(subject)
+        pages = (pages_by_num[page_num] for page_num in selected_pages)
+    # Register the font before the first page so its internal name (and TTF subset)
+    # is the same in every document, as cached fragments refer to it by name.
+    primer = pdf.beginText()
+    primer.setFont(font_name, font_size)
+    primer.textOut(" ")
+
+    shared_lines = [mission_style.title_line, mission_style.goss_line]
+
+    fragment_settings = ""
+    if fragment_cache is not None:
+        fragment_settings = fragment_settings_digest(
+            geometry=geometry,
+            font_path=font_path,
+            font_name=font_name,
+            font_size=font_size,
+            faux_bold_pt=faux_bold_pt,
+            columns=columns,
+            space_len=space_len,
+            mission_style=mission_style,
+        )
+
+    if page_layouts is None:
+        page_layouts = ((page, None) for page in pages)
+    # Fetching the next page decodes it (or, with `page_layouts`, waits for its layout).
+    decode_start = time.perf_counter()
+    for page_num, (page, page_layout) in zip(selected_pages, page_layouts, strict=True):
+        layout_start = time.perf_counter()
+        fragment_key = ""
+        cached = None
+        if fragment_cache is not None:
+            fragment_key = fragment_cache.key(page, fragment_settings, mission_style)
+            cached = fragment_cache.get(fragment_key)
+
+        if cached is not None:
+            kind, code = cached
+            draw_start = time.perf_counter()
+        else:
+            if page_layout is None:
+                if layout_cache is not None:
+                    page_layout = layout_cache.get_or_build(
+                        page, columns, space_len, mission_style
+                    )
                 else:
-                    top_blanks = int(mission_style.get("note_top_blank_lines", 2))
-                    y = y_header - (top_blanks * line_height)
-                for line in note_lines:
-                    text_width_line = pdfmetrics.stringWidth(line, font_name, font_size)
-                    x = max(0.0, (page_width - text_width_line) / 2)
-                    pdf.drawString(x, y, line)
-                    if faux_bold_pt > 0:
-                        pdf.drawString(x + faux_bold_pt, y, line)
-                    y -= line_height
-        elif centered_rest_page:
-            rest_header_lines: list[str] = []
-            if bool(mission_style.get("rest_period_keep_header", True)):
-                rest_header_lines = build_rest_period_header_lines(page, columns, mission_style)
-            rest_lines = build_rest_period_lines(page, columns, space_len)
-
-            y_header = top_y
-            for line in rest_header_lines:
-                pdf.drawString(left_margin, y_header, line)
-                if faux_bold_pt > 0:
-                    pdf.drawString(left_margin + faux_bold_pt, y_header, line)
-                y_header -= line_height
-
-            if rest_lines:
-                content_height = (len(rest_lines) - 1) * line_height
-                y = (page_height + content_height) / 2
-                for line in rest_lines:
-                    text_width_line = pdfmetrics.stringWidth(line, font_name, font_size)
-                    x = max(0.0, (page_width - text_width_line) / 2)
-                    pdf.drawString(x, y, line)
-                    if faux_bold_pt > 0:
-                        pdf.drawString(x + faux_bold_pt, y, line)
-                    y -= line_height
+                    page_layout = layout_page(page, columns, space_len, mission_style)
+            kind = page_layout.kind
+            draw_start = time.perf_counter()
+            placements = place_lines(page_layout, geometry)
+            if compact and writer is not None:
+                code = compact_page_code(
+                    pdf,
+                    writer,
+                    placements,
+                    shared_lines,
+                    geometry,
+                    font_name,
+                    font_size,
+                    faux_bold_pt,
+                )
+            else:
+                code = page_text_code(pdf, placements, font_name, font_size, faux_bold_pt)
+            if fragment_cache is not None and is_portable_code(font_path, placements):
+                fragment_cache.put(fragment_key, kind, code)
+
+        if writer is not None:
+            writer.add_page(code, line_width=faux_bold_pt)
         else:
-            lines = build_page_lines(page, columns, space_len, mission_style)
-            max_lines = int((page_height - top_margin_pt - bottom_margin_pt) / line_height)
+            draw_page_code(pdf, code, faux_bold_pt)
+            pdf.showPage()
+        if page_sinks:
+            # Text exports share this page's layout; a replayed fragment still needs one.
+            if page_layout is None:
+                if layout_cache is not None:
+                    page_layout = layout_cache.get_or_build(
+                        page, columns, space_len, mission_style
+                    )
+                else:
+                    page_layout = layout_page(page, columns, space_len, mission_style)
+            for sink in page_sinks:
+                sink.write_page(page, page_layout)
+        if profiler is not None:
+            profiler.record_page(
+                page_num,
+                kind,
+                layout_start - decode_start,
+                draw_start - layout_start,
+                time.perf_counter() - draw_start,
+            )
+        decode_start = time.perf_counter()
 
-            if fit_to_page and len(lines) > max_lines and len(lines) > 1:
-                line_height = (page_height - top_margin_pt - bottom_margin_pt) / (len(lines) - 1)
-            else:
-                lines = lines[:max_lines]
-
-            y = top_y
-            for line in lines:
-                pdf.drawString(left_margin, y, line)
-                if faux_bold_pt > 0:
-                    pdf.drawString(left_margin + faux_bold_pt, y, line)
-                y -= line_height
-        pdf.showPage()
-        pdf.setFont(font_name, font_size)
-
-    pdf.save()
+    sizes = None
+    with profile_stage(profiler, "pdf_save"):
+        if writer is not None:
+            sizes = writer.close()
+        else:
+            pdf.save()
+    if profiler is not None and layout_cache is not None:
+        profiler.count("layout_cache_hits", layout_cache.hits)
+        profiler.count("layout_cache_misses", layout_cache.misses)
+    if profiler is not None and fragment_cache is not None:
+        profiler.count("fragment_cache_hits", fragment_cache.hits)
+        profiler.count("fragment_cache_misses", fragment_cache.misses)
+    if profiler is not None and sizes is not None:
+        for part, size in sizes.items():
+            profiler.count(f"pdf_{part}_bytes", size)
+    return sizes
@@ -0,0 +1,413 @@
+"""Long-lived HTTP render server for on-demand page excerpts."""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import socketserver
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from batch import discover_missions
+from cli import build_parser, prepare_render
+from config import config_defaults, load_merged_config
+from constants import (
+    DEFAULT_COMMON_CONFIG,
+    DEFAULT_FRAGMENT_CACHE_DIR,
+    DEFAULT_MISSION_CONFIG,
+    DEFAULT_MISSIONS_DIR,
+    DEFAULT_SERVER_CACHE_ENTRIES,
+    DEFAULT_SERVER_CACHE_MAX_MB,
+    DEFAULT_SERVER_HOST,
+    DEFAULT_SERVER_PORT,
+)
+from fragment_cache import FragmentCache
+from io_utils import close_pages, page_search_index, resolve_input_json_path
+from layout import parse_pages_arg
+from page_search import filter_selection
+from renderer import render_pdf, resolve_page_selection
+
+# Query parameters accepted by /render, mirroring the CLI page selection flags.
+_SELECTION_PARAMS = (
+    "pages",
+    "pdf_pages",
+    "start_page",
+    "end_page",
+    "pdf_start_page",
+    "pdf_end_page",
+    "pdf_offset",
+    "get_range",
+    "tape",
+    "speaker",
+)
+_TEXT_PARAMS = ("pages", "pdf_pages", "get_range", "tape", "speaker")
+
+# Result cache and in-flight keys: mission, source stamp, resolved pages.
+_ResultKey = tuple[str, tuple[int, int] | None, tuple[int, ...]]
+
+
+def _source_stamp(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class RequestError(ValueError):
+    """A render request that cannot be served, with its HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class MissionState:
+    """Merged config, parsed defaults and loaded pages of one mission, kept warm.
+
+    `source` is the size and mtime of the transcript when its pages were loaded.
+    """
+
+    args: argparse.Namespace
+    render_kwargs: dict[str, Any]
+    source_path: str
+    source: tuple[int, int] | None
+
+    def is_current(self) -> bool:
+        return _source_stamp(self.source_path) == self.source
+
+
+class RenderService:
+    """Renders page selections to PDF bytes with warm mission state.
+
+    Results are keyed by mission and resolved page list, so equivalent
+    selections (`pages=3-12` and `pdf_pages=5-14`) share one entry. Identical
+    requests that arrive while a render is running wait for that render
+    instead of starting another; overlapping but different selections render
+    separately. Finished PDFs stay in an LRU cache bounded by entry count and
+    total bytes. A mission whose transcript changed on disk is reloaded on
+    its next request, and its cached results are dropped.
+    """
+
+    def __init__(
+        self,
+        common_config: str = DEFAULT_COMMON_CONFIG,
+        missions_dir: str = DEFAULT_MISSIONS_DIR,
+        cache_entries: int = DEFAULT_SERVER_CACHE_ENTRIES,
+        cache_max_bytes: int = DEFAULT_SERVER_CACHE_MAX_MB << 20,
+        fragment_cache: FragmentCache | None = None,
+    ) -> None:
+        self.common_config = common_config
+        self.mission_paths = {path.stem: path for path in discover_missions(missions_dir)}
+        self.cache_entries = cache_entries
+        self.cache_max_bytes = cache_max_bytes
+        self.fragment_cache = fragment_cache
+        self.counters: Counter[str] = Counter()
+        self._missions: dict[str, MissionState] = {}
+        self._cache: OrderedDict[_ResultKey, bytes] = OrderedDict()
+        self._cache_bytes = 0
+        self._inflight: dict[_ResultKey, Future[bytes]] = {}
+        self._lock = threading.Lock()
+        self._mission_lock = threading.Lock()
+
+    def mission(self, name: str) -> MissionState:
+        state = self._missions.get(name)
+        if state is not None and state.is_current():
+            return state
+        mission_path = self.mission_paths.get(name)
+        if mission_path is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Unknown mission: {name}")
+        with self._mission_lock:
+            state = self._missions.get(name)
+            if state is not None and state.is_current():
+                return state
+            defaults = config_defaults(load_merged_config(self.common_config, str(mission_path)))
+            args = build_parser(defaults=defaults).parse_args([])
+            source_path = resolve_input_json_path(args.json)
+            source = _source_stamp(source_path)
+            render_kwargs = prepare_render(args, defaults, fragment_cache=self.fragment_cache)
+            self._missions[name] = MissionState(args, render_kwargs, source_path, source)
+            if state is not None:
+                self._retire(name, state)
+        return self._missions[name]
+
+    def _retire(self, name: str, state: MissionState) -> None:
+        """Drop the cached results of a replaced mission state and unmap its pages.
+
+        Renders still running on it fail, as their transcript changed under them.
+        """
+        with self._lock:
+            for key in [key for key in self._cache if key[:2] == (name, state.source)]:
+                self._cache_bytes -= len(self._cache.pop(key))
+            self.counters["reloads"] += 1
+        close_pages(state.render_kwargs["pages_by_num"])
+
+    def select_pages(self, state: MissionState, query: dict[str, str]) -> list[int]:
+        args = state.args
+        try:
+            values = {
+                key: int(query[key])
+                for key in _SELECTION_PARAMS
+                if key not in _TEXT_PARAMS and query.get(key)
+            }
+            pages_by_num = state.render_kwargs["pages_by_num"]
+            selected = resolve_page_selection(
+                pages_by_num=pages_by_num,
+                pages=parse_pages_arg(query.get("pages", "")),
+                page_start=values.get("start_page", args.start_page),
+                page_end=values.get("end_page", args.end_page),
+                pdf_pages=parse_pages_arg(query.get("pdf_pages", "")),
+                pdf_start=values.get("pdf_start_page"),
+                pdf_end=values.get("pdf_end_page"),
+                pdf_offset=values.get("pdf_offset", args.pdf_offset),
+            )
+            return filter_selection(
+                selected,
+                page_search_index(pages_by_num),
+                get_range=query.get("get_range", ""),
+                tapes=query.get("tape", ""),
+                speakers=query.get("speaker", ""),
+            )
+        except ValueError as exc:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+
+    def render(self, mission: str, query: dict[str, str]) -> bytes:
+        state = self.mission(mission)
+        selected_pages = self.select_pages(state, query)
+        key: _ResultKey = (mission, state.source, tuple(selected_pages))
+
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                self.counters["cache_hits"] += 1
+                return data
+            pending = self._inflight.get(key)
+            if pending is None:
+                future: Future[bytes] = Future()
+                self._inflight[key] = future
+                self.counters["renders"] += 1
+            else:
+                self.counters["coalesced"] += 1
+        if pending is not None:
+            return pending.result()
+
+        try:
+            buffer = io.BytesIO()
+            render_kwargs = dict(state.render_kwargs)
+            render_kwargs["selected_pages"] = selected_pages
+            render_kwargs["output_path"] = buffer
+            render_pdf(**render_kwargs, invariant=True)
+            data = buffer.getvalue()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            if self._missions.get(mission) is state:
+                self._store(key, data)
+        future.set_result(data)
+        return data
+
+    def _store(self, key: _ResultKey, data: bytes) -> None:
+        if len(data) > self.cache_max_bytes or self.cache_entries < 1:
+            return
+        self._cache[key] = data
+        self._cache_bytes += len(data)
+        while len(self._cache) > self.cache_entries or self._cache_bytes > self.cache_max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+            self.counters["evictions"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "missions_loaded": sorted(self._missions),
+                "cache_entries": len(self._cache),
+                "cache_bytes": self._cache_bytes,
+                **self.counters,
+                **(
+                    {
+                        "fragment_cache_hits": self.fragment_cache.hits,
+                        "fragment_cache_misses": self.fragment_cache.misses,
+                    }
+                    if self.fragment_cache is not None
+                    else {}
+                ),
+            }
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """Serves `GET /render?mission=...&pages=...` as PDF bytes and `GET /stats` as JSON."""
+
+    service: RenderService
+    default_mission: str
+    quiet = False
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == "/stats":
+            self._send(HTTPStatus.OK, "application/json", json.dumps(self.service.stats()).encode())
+            return
+        if url.path != "/render":
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: {url.path}")
+            return
+        unknown = set(query) - {"mission", *_SELECTION_PARAMS}
+        if unknown:
+            self._send_error(
+                HTTPStatus.BAD_REQUEST, f"Unknown parameter(s): {', '.join(sorted(unknown))}"
+            )
+            return
+        try:
+            data = self.service.render(query.get("mission", self.default_mission), query)
+        except RequestError as exc:
+            self._send_error(exc.status, str(exc))
+            return
+        except Exception as exc:  # report render failures to the client, keep serving
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(exc).__name__}: {exc}")
+            return
+        self._send(HTTPStatus.OK, "application/pdf", data)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send(status, "text/plain; charset=utf-8", (message + "\n").encode())
+
+    def _send(self, status: HTTPStatus, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def build_server_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="nasa-transcript-printer serve",
+        description="Serve page-range PDFs from warm mission state over HTTP.",
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_SERVER_HOST,
+        help=f"Bind address (default: {DEFAULT_SERVER_HOST})",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_SERVER_PORT,
+        help=f"TCP port (default: {DEFAULT_SERVER_PORT})",
+    )
+    parser.add_argument("--socket", default="", help="Listen on this Unix socket path instead")
+    parser.add_argument(
+        "--common-config",
+        default=DEFAULT_COMMON_CONFIG,
+        help=f"Common TOML configuration (default: {DEFAULT_COMMON_CONFIG})",
+    )
+    parser.add_argument(
+        "--missions-dir",
+        default=DEFAULT_MISSIONS_DIR,
+        help=f"Directory of mission TOML configs (default: {DEFAULT_MISSIONS_DIR})",
+    )
+    parser.add_argument(
+        "--mission",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="Load this mission at startup (repeatable); the first is the request default",
+    )
+    parser.add_argument(
+        "--cache-entries",
+        type=int,
+        default=DEFAULT_SERVER_CACHE_ENTRIES,
+        help=f"Rendered excerpts kept in memory (default: {DEFAULT_SERVER_CACHE_ENTRIES})",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_SERVER_CACHE_MAX_MB,
+        help=f"Memory limit for rendered excerpts in MB (default: {DEFAULT_SERVER_CACHE_MAX_MB})",
+    )
+    parser.add_argument(
+        "--fragment-cache-dir",
+        default=DEFAULT_FRAGMENT_CACHE_DIR,
+        help=f"On-disk rendered page cache directory (default: {DEFAULT_FRAGMENT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-fragment-cache",
+        action="store_false",
+        dest="fragment_cache",
+        help="Always draw pages instead of replaying cached page fragments",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Do not log requests")
+    return parser
+
+
+def run_server(argv: list[str] | None = None) -> int:
+    parser = build_server_parser()
+    args = parser.parse_args(argv)
+
+    fragment_cache = None
+    if args.fragment_cache:
+        fragment_cache = FragmentCache(args.fragment_cache_dir)
+        fragment_cache.prune()
+    service = RenderService(
+        common_config=args.common_config,
+        missions_dir=args.missions_dir,
+        cache_entries=args.cache_entries,
+        cache_max_bytes=args.cache_max_mb << 20,
+        fragment_cache=fragment_cache,
+    )
+    default_mission = args.mission[0] if args.mission else Path(DEFAULT_MISSION_CONFIG).stem
+    try:
+        for name in args.mission or [default_mission]:
+            service.mission(name)
+    except RequestError as exc:
+        parser.error(str(exc))
+
+    handler = type(
+        "BoundRenderRequestHandler",
+        (RenderRequestHandler,),
+        {"service": service, "default_mission": default_mission, "quiet": args.quiet},
+    )
+    httpd: socketserver.BaseServer
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        httpd = _ThreadingUnixHTTPServer(args.socket, handler)
+        address = args.socket
+    else:
+        httpd = ThreadingHTTPServer((args.host, args.port), handler)
+        address = f"http://{args.host}:{args.port}"
+    print(f"Serving {', '.join(service.stats()['missions_loaded'])} on {address}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
@@ -0,0 +1,166 @@
+"""`--split-by tape`: one PDF per tape, rendered concurrently, and an outlined combined PDF."""
+
+from __future__ import annotations
+
+import re
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from incremental import render_pdf_incremental
+from io_utils import iter_pages
+from model import BlockType, Page
+from page_search import tape_number
+from pdf_tools import add_outline
+from profiling import Profiler, profile_stage
+from renderer import render_pdf
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@dataclass(frozen=True)
+class TapeResult:
+    """One tape file, as reported in the summary."""
+
+    tape: str
+    output_path: str
+    pages: int
+    rendered: int
+    seconds: float
+
+
+def tape_output_dir(output_path: str) -> Path:
+    """Directory of the tape files: `output/run.pdf` -> `output/run_tapes/`."""
+    path = Path(output_path)
+    return path.with_name(f"{path.stem}_tapes")
+
+
+def tape_file_name(tape: str) -> str:
+    """`7` -> `tape_007.pdf`; other labels are kept, minus unsafe characters."""
+    label = f"{int(tape):03d}" if tape.isdigit() else _UNSAFE_NAME.sub("-", tape) or "none"
+    return f"tape_{label}.pdf"
+
+
+def split_by_tape(
+    pages_by_num: Mapping[int, Page], selected_pages: list[int]
+) -> dict[str, dict[int, Page]]:
+    """Selected pages grouped by tape number, in order of first appearance."""
+    tapes: dict[str, dict[int, Page]] = {}
+    pages = iter_pages(pages_by_num, selected_pages)
+    for page_num, page in zip(selected_pages, pages, strict=True):
+        tape = tape_number(page.header.tape) if page.header.tape else ""
+        tapes.setdefault(tape, {})[page_num] = page
+    return tapes
+
+
+def first_get(page: Page) -> str:
+    for block in page.blocks:
+        if block.type == BlockType.COMM and block.timestamp:
+            return block.timestamp
+    return ""
+
+
+def tape_outline(
+    tapes: Mapping[str, Mapping[int, Page]], selected_pages: list[int]
+) -> list[tuple[str, list[tuple[int, str]]]]:
+    """Bookmarks of the combined PDF: each tape, then its pages with their first GET."""
+    index_of = {page_num: index for index, page_num in enumerate(selected_pages)}
+    outline = []
+    for tape, pages in tapes.items():
+        children = []
+        for page_num, page in pages.items():
+            get = first_get(page)
+            title = f"Page {page_num}, GET {get}" if get else f"Page {page_num}"
+            children.append((index_of[page_num], title))
+        outline.append((f"Tape {tape}" if tape else "No tape", children))
+    return outline
+
+
+def _render_tape(task: tuple[str, dict[str, Any], bool]) -> TapeResult:
+    tape, render_kwargs, incremental = task
+    start = time.perf_counter()
+    pages = len(render_kwargs["selected_pages"])
+    if incremental:
+        rendered = len(render_pdf_incremental(**render_kwargs))
+    else:
+        render_pdf(**render_kwargs)
+        rendered = pages
+    return TapeResult(
+        tape=tape,
+        output_path=render_kwargs["output_path"],
+        pages=pages,
+        rendered=rendered,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def render_split(
+    *,
+    pages_by_num: Mapping[int, Page],
+    output_path: str,
+    selected_pages: list[int],
+    jobs: int,
+    incremental: bool = False,
+    combined: bool = False,
+    profiler: Profiler | None = None,
+    **render_kwargs: Any,
+) -> list[TapeResult]:
+    """Render each tape of the selection to its own PDF under `tape_output_dir`.
+
+    Tapes are rendered on up to `jobs` worker processes. With `incremental`,
+    each tape file keeps a build manifest and only changed pages are redrawn,
+    so editing one tape leaves the other files untouched. `combined` also
+    renders the whole selection to `output_path`, as one more task, and gives
+    it a tape -> page outline. It is not reported in the results.
+    """
+    tapes = split_by_tape(pages_by_num, selected_pages)
+    out_dir = tape_output_dir(output_path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tasks = []
+    if combined:
+        # Rendered rather than merged from the tape files: one font subset for the
+        # whole document instead of one per tape. Largest task first.
+        combined_pages = {
+            page_num: page for pages in tapes.values() for page_num, page in pages.items()
+        }
+        combined_kwargs = {
+            **render_kwargs,
+            "pages_by_num": combined_pages,
+            "selected_pages": selected_pages,
+            "output_path": output_path,
+        }
+        tasks.append(("", combined_kwargs, incremental))
+    for tape, pages in tapes.items():
+        tape_kwargs = {
+            **render_kwargs,
+            "pages_by_num": pages,
+            "selected_pages": list(pages),
+            "output_path": str(out_dir / tape_file_name(tape)),
+        }
+        tasks.append((tape, tape_kwargs, incremental))
+
+    workers = max(1, min(jobs, len(tasks)))
+    with profile_stage(profiler, "render_tapes"):
+        if workers == 1:
+            results = [_render_tape(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_render_tape, tasks))
+
+    if combined:
+        results = results[1:]
+        with profile_stage(profiler, "outline"):
+            add_outline(output_path, tape_outline(tapes, selected_pages))
+    return results
+
+
+def format_summary(results: list[TapeResult], elapsed: float) -> str:
+    rendered = sum(result.rendered > 0 for result in results)
+    pages = sum(result.rendered for result in results)
+    return (
+        f"{len(results)} tapes: {rendered} rendered ({pages} pages), "
+        f"{len(results) - rendered} up to date in {elapsed:.2f}s"
+    )
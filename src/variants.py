@@ -0,0 +1,120 @@
+"""`--variants`: several PDFs of one selection from a single load and shared layouts."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from layout import PageLayout, layout_page
+from layout_cache import LayoutCache
+from profiling import Profiler, profile_stage
+from renderer import render_pdf
+
+
+@dataclass(frozen=True)
+class VariantResult:
+    """One rendered variant, as reported in the summary."""
+
+    name: str
+    output_path: str
+    pages: int
+    seconds: float
+
+
+def layout_key(render_kwargs: Mapping[str, Any]) -> tuple[Any, ...]:
+    """Settings a page layout depends on; variants with equal keys share layouts."""
+    return (
+        render_kwargs["columns"],
+        render_kwargs["space_len"],
+        render_kwargs["mission_style"],
+    )
+
+
+def shared_layouts(
+    variants: Mapping[str, dict[str, Any]], layout_cache: LayoutCache | None = None
+) -> dict[tuple[Any, ...], dict[int, PageLayout]]:
+    """Lay out the selected pages once per distinct layout key."""
+    layouts: dict[tuple[Any, ...], dict[int, PageLayout]] = {}
+    for render_kwargs in variants.values():
+        columns, space_len, mission_style = key = layout_key(render_kwargs)
+        by_page = layouts.setdefault(key, {})
+        pages_by_num = render_kwargs["pages_by_num"]
+        for page_num in render_kwargs["selected_pages"]:
+            if page_num in by_page:
+                continue
+            page = pages_by_num[page_num]
+            if layout_cache is not None:
+                by_page[page_num] = layout_cache.get_or_build(
+                    page, columns, space_len, mission_style
+                )
+            else:
+                by_page[page_num] = layout_page(page, columns, space_len, mission_style)
+    return layouts
+
+
+def _draw_variant(task: tuple[str, dict[str, Any], list[PageLayout]]) -> VariantResult:
+    name, render_kwargs, page_layouts = task
+    start = time.perf_counter()
+    pages_by_num = render_kwargs["pages_by_num"]
+    pages = [pages_by_num[page_num] for page_num in render_kwargs["selected_pages"]]
+    render_pdf(**render_kwargs, page_layouts=iter(zip(pages, page_layouts, strict=True)))
+    return VariantResult(
+        name=name,
+        output_path=render_kwargs["output_path"],
+        pages=len(page_layouts),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def render_variants(
+    variants: Mapping[str, dict[str, Any]],
+    *,
+    jobs: int,
+    layout_cache: LayoutCache | None = None,
+    profiler: Profiler | None = None,
+    **render_options: Any,
+) -> list[VariantResult]:
+    """Render every variant's `render_pdf` arguments to its own output.
+
+    Pages are laid out once per layout key in this process. Drawing and
+    writing run on up to `jobs` worker processes, one variant each; workers
+    get only the selected pages, so lazily loaded inputs stay in this process.
+    `render_options` (such as `streaming`) apply to every variant.
+    """
+    with profile_stage(profiler, "variant_layout"):
+        layouts = shared_layouts(variants, layout_cache)
+    tasks = []
+    for name, render_kwargs in variants.items():
+        selected = render_kwargs["selected_pages"]
+        by_page = layouts[layout_key(render_kwargs)]
+        pages_by_num = render_kwargs["pages_by_num"]
+        task_kwargs = {
+            **render_kwargs,
+            **render_options,
+            "pages_by_num": {page_num: pages_by_num[page_num] for page_num in selected},
+            "layout_cache": None,
+            "profiler": None,
+        }
+        tasks.append((name, task_kwargs, [by_page[page_num] for page_num in selected]))
+
+    workers = max(1, min(jobs, len(tasks)))
+    with profile_stage(profiler, "variant_draw"):
+        if workers == 1:
+            return [_draw_variant(task) for task in tasks]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_draw_variant, tasks))
+
+
+def format_summary(results: list[VariantResult], elapsed: float) -> str:
+    name_width = max([len("variant"), *(len(result.name) for result in results)])
+    lines = [f"{'variant':<{name_width}}  {'pages':>5}  {'time':>7}  output"]
+    for result in results:
+        lines.append(
+            f"{result.name:<{name_width}}  {result.pages:>5}  {result.seconds:>6.2f}s  "
+            f"{result.output_path}"
+        )
+    lines.append(f"{len(results)} variants in {elapsed:.2f}s")
+    return "\n".join(lines)
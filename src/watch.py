@@ -0,0 +1,180 @@
+"""`--watch`: keep the PDF current while the transcript JSON and config files are edited."""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+from cli import build_parser, prepare_render
+from config import config_defaults, load_merged_config
+from constants import WATCH_DEBOUNCE_S, WATCH_POLL_S
+from fragment_cache import FragmentCache
+from incremental import (
+    build_manifest,
+    changed_pages,
+    load_manifest,
+    manifest_path_for,
+    render_pdf_incremental,
+)
+from io_utils import close_pages, resolve_input_json_path
+from layout_cache import LayoutCache
+from profiling import Profiler, profile_stage
+from renderer import render_pdf
+
+
+def _signature(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """Polls the modification time and size of a few files.
+
+    `wait()` returns once any of them changed and then stayed unchanged for
+    `debounce` seconds, so an editor's save (truncate, write, rename) triggers
+    one rebuild, after the file is complete.
+    """
+
+    def __init__(self, poll: float = WATCH_POLL_S, debounce: float = WATCH_DEBOUNCE_S) -> None:
+        self.poll = poll
+        self.debounce = debounce
+        self.state: dict[str, tuple[int, int] | None] = {}
+
+    def watch(self, paths: Sequence[str]) -> None:
+        """Watch `paths` from their current state on."""
+        self.state = {path: _signature(path) for path in paths}
+
+    def _snapshot(self) -> dict[str, tuple[int, int] | None]:
+        return {path: _signature(path) for path in self.state}
+
+    def wait(self) -> list[str]:
+        """Block until a change settles; return the changed paths."""
+        while True:
+            time.sleep(self.poll)
+            current = self._snapshot()
+            if current == self.state:
+                continue
+            settled_at = time.monotonic()
+            while time.monotonic() - settled_at < self.debounce:
+                time.sleep(self.poll)
+                latest = self._snapshot()
+                if latest != current:
+                    current = latest
+                    settled_at = time.monotonic()
+            changed = [path for path in self.state if current[path] != self.state[path]]
+            self.state = current
+            return changed
+
+
+def preview_path_for(output_path: str) -> str:
+    """`output/run.pdf` -> `output/run.preview.pdf`."""
+    return str(Path(output_path).with_suffix(".preview.pdf"))
+
+
+class PreviewBaseline:
+    """Page hashes the next `--watch-preview` rebuild is compared with.
+
+    It starts as the output's build manifest and then follows each preview,
+    so a save previews only the pages it changed. Without an output manifest,
+    the first rebuild only records the baseline. It is kept in memory: the
+    output and its manifest are never touched.
+    """
+
+    def __init__(self) -> None:
+        self.manifest: dict[str, Any] | None = None
+        self.loaded = False
+
+    def previous(self, output_path: str) -> dict[str, Any] | None:
+        if not self.loaded:
+            self.manifest = load_manifest(manifest_path_for(output_path))
+            self.loaded = True
+        return self.manifest
+
+
+def rebuild(
+    render_kwargs: dict[str, Any],
+    preview: PreviewBaseline | None,
+    render: Callable[..., object],
+) -> str:
+    """Bring the output (or, with a `preview` baseline, the preview) up to date.
+
+    Returns a one-line summary.
+    """
+    start = time.perf_counter()
+    output_path = render_kwargs["output_path"]
+    if preview is not None:
+        manifest = build_manifest(render_kwargs)
+        previous = preview.previous(output_path)
+        if previous is None:
+            preview.manifest = manifest
+            return f"preview baseline recorded ({len(manifest['pages'])} pages)"
+        pages = changed_pages(manifest, previous)
+        if pages:
+            output_path = preview_path_for(output_path)
+            preview_kwargs = dict(render_kwargs, output_path=output_path, selected_pages=pages)
+            render(**preview_kwargs)
+        preview.manifest = manifest
+    else:
+        pages = render_pdf_incremental(render=render, **render_kwargs)
+    elapsed = time.perf_counter() - start
+    if not pages:
+        return f"up to date ({elapsed:.2f}s)"
+    return f"{len(pages)} page(s) rendered to {output_path} in {elapsed:.2f}s"
+
+
+def run_watch(
+    argv: Sequence[str],
+    common_config: str,
+    mission_config: str,
+    *,
+    preview: bool = False,
+    render: Callable[..., object] = render_pdf,
+    layout_cache: LayoutCache | None = None,
+    fragment_cache: FragmentCache | None = None,
+    profiler: Profiler | None = None,
+) -> int:
+    """Render, then re-render affected pages after every settled edit until interrupted.
+
+    Config and arguments are re-read on each change: a per-page edit re-renders
+    that page, a global layout setting (columns, fonts, margins) the whole
+    selection. Errors, such as a half-saved JSON file, are reported and the
+    watch goes on. `profiler` records the stages of every rebuild.
+    """
+    watcher = FileWatcher()
+    baseline = PreviewBaseline() if preview else None
+    watched = [common_config, mission_config]
+    try:
+        while True:
+            watcher.watch(watched)
+            try:
+                defaults = config_defaults(load_merged_config(common_config, mission_config))
+                args = build_parser(defaults=defaults).parse_args(list(argv))
+                watched = [common_config, mission_config, resolve_input_json_path(args.json)]
+                watcher.watch(watched)
+                render_kwargs = prepare_render(
+                    args,
+                    defaults,
+                    layout_cache=layout_cache,
+                    fragment_cache=fragment_cache,
+                    profiler=profiler,
+                )
+                try:
+                    with profile_stage(profiler, "render"):
+                        summary = rebuild(render_kwargs, baseline, render)
+                finally:
+                    # The next rebuild maps the transcript afresh.
+                    close_pages(render_kwargs["pages_by_num"])
+                print(f"watch: {summary}", flush=True)
+            except Exception as exc:
+                # A half-saved or invalid file must not end the watch; the next save retries.
+                print(f"watch: error: {type(exc).__name__}: {exc}", flush=True)
+            changed = watcher.wait()
+            print(f"watch: changed {', '.join(changed)}", flush=True)
+    except KeyboardInterrupt:
+        return 0
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from io_utils import IndexedPages, close_pages, load_pages
+
+
+def _write_transcript(path: Path, text: str) -> None:
+    page = {"header": {"page": 1, "tape": "1/1"}, "blocks": [{"type": "annotation", "text": text}]}
+    path.write_text(json.dumps({"document": {}, "pages": {"Page 001": page}}), encoding="utf-8")
+
+
+def test_decode_refuses_a_transcript_edited_after_indexing(tmp_path: Path) -> None:
+    json_path = tmp_path / "mission.json"
+    _write_transcript(json_path, "LAUNCH")
+    pages = load_pages(str(json_path))
+    assert isinstance(pages, IndexedPages)
+    assert pages.decode(1).blocks[0].text == "LAUNCH"
+
+    _write_transcript(json_path, "LIFTOFF AND CLEARED THE TOWER")
+    os.utime(json_path, ns=(0, 0))
+    with pytest.raises(RuntimeError, match="changed since its page index was read"):
+        pages.decode(1)
+    close_pages(pages)
+
+    reloaded = load_pages(str(json_path))
+    assert reloaded[1].blocks[0].text == "LIFTOFF AND CLEARED THE TOWER"
+    close_pages(reloaded)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Any
+
+from model import Page
+from page_search import PageSearchIndex, build_search_index, filter_selection, parse_get_range
+
+
+def _comm(timestamp: str) -> dict[str, Any]:
+    return {"type": "comm", "timestamp": timestamp, "speaker": "CC", "text": "Roger."}
+
+
+def _page(num: int, *blocks: dict[str, Any]) -> Page:
+    return Page.from_dict({"header": {"page": num, "tape": "1/1"}, "blocks": list(blocks)})
+
+
+def _index() -> PageSearchIndex:
+    pages = [
+        _page(1, _comm("00 00 10 00"), _comm("00 00 20 00")),
+        _page(2, {"type": "annotation", "text": "REST PERIOD - NO COMMUNICATIONS"}),
+        _page(3, _comm("00 01 00 00")),
+        _page(4),
+    ]
+    return PageSearchIndex(build_search_index(pages))
+
+
+def test_window_keeps_pages_without_comms_between_comm_pages() -> None:
+    assert _index().pages_in_get_range(*parse_get_range("00 00 20 00-00 01 00 00")) == {1, 2, 3}
+
+
+def test_window_between_two_comms_selects_their_page() -> None:
+    assert _index().pages_in_get_range(*parse_get_range("00 00 12 00-00 00 15 00")) == {1}
+
+
+def test_single_get_selects_the_page_it_falls_on() -> None:
+    assert _index().pages_in_get_range(*parse_get_range("00 00 30 00")) == {1}
+
+
+def test_open_window_runs_to_the_last_page() -> None:
+    assert _index().pages_in_get_range(*parse_get_range("00 00 30 00-")) == {1, 2, 3, 4}
+
+
+def test_window_before_the_first_comm_selects_nothing() -> None:
+    assert _index().pages_in_get_range(*parse_get_range("00 00 01 00-00 00 02 00")) == set()
+
+
+def test_filter_selection_keeps_selection_order() -> None:
+    selected = filter_selection([4, 3, 2, 1], _index(), get_range="00 00 20 00-00 01 00 00")
+    assert selected == [3, 2, 1]